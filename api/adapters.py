@@ -7,10 +7,11 @@ from allauth.account.adapter import DefaultAccountAdapter
 from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 from django.conf import settings
 from django.utils import timezone
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from core.models import User
 
+from .authentication import ClaimsRefreshToken
+
 logger = logging.getLogger(__name__)
 
 
@@ -169,7 +170,7 @@ class CustomAccountAdapter(DefaultAccountAdapter):
         if hasattr(user, "is_authenticated") and user.is_authenticated:
             try:
                 # 生成 JWT token
-                refresh = RefreshToken.for_user(user)
+                refresh = ClaimsRefreshToken.for_user(user)
                 access_token = str(refresh.access_token)
                 refresh_token = str(refresh)
 
@@ -3,3 +3,13 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # 注册 Permission 变更时的权限缓存失效处理
+        from .services import permission_service # noqa: F401
+        # 注册收藏变更时的收藏数维护与收藏缓存失效处理
+        from .services import favorite_service # noqa: F401
+        # 注册用户变更时的认证缓存失效处理
+        from .services import auth_cache # noqa: F401
+        # 注册代币目录变更时的响应缓存失效处理
+        from .services import response_cache # noqa: F401
@@ -0,0 +1,115 @@
+"""
+异步视图模块：在 ASGI 下运行，慢速的上游 I/O 不占用工作线程
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import ClaimsJWTAuthentication
+from .services.async_market_service import AsyncMarketService
+from .services.stream_hub import get_stream_hub
+
+
+def _int_param(request, name, default):
+    try:
+        return int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@require_GET
+async def token_details(request, token_address):
+    """代币详情：CoinGecko 详情与链上供应量并发获取"""
+    result = await AsyncMarketService().get_token_details(token_address)
+    if result is None:
+        return JsonResponse({"error": "Failed to fetch token details"}, status=502)
+    return JsonResponse(result)
+
+
+@require_GET
+async def market_list_onchain(request):
+    """热门代币列表，并为当前页所有代币并发补充链上供应量"""
+    vs_currency = request.GET.get("vs_currency", "usd").upper()
+    limit = _int_param(request, "limit", 10)
+    offset = _int_param(request, "offset", 0)
+
+    per_page = limit
+    page = (offset // limit) + 1 if limit > 0 else 1
+
+    result = await AsyncMarketService().get_top_tokens_with_onchain(
+        vs_currency=vs_currency, page=page, per_page=per_page
+    )
+    return JsonResponse(result)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def _authenticate(request):
+    """从 Authorization: Bearer 头或 access_token 查询参数（EventSource 无法设置请求头）读取 JWT"""
+    header = request.headers.get("Authorization", "")
+    raw_token = header[7:] if header.startswith("Bearer ") else None
+    raw_token = raw_token or request.GET.get("access_token")
+    if not raw_token:
+        return None
+    authentication = ClaimsJWTAuthentication()
+    try:
+        # 吊销名单刷新与完整用户加载可能查询数据库
+        validated = await sync_to_async(authentication.get_validated_token)(raw_token)
+        return await sync_to_async(authentication.get_user)(validated)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+@require_GET
+async def stream(request):
+    """Server-Sent Events 推送
+
+    查询参数：
+        vs_currency: 订阅该计价货币的价格变动（公开）
+        tokens: 逗号分隔的代币 ID，订阅这些代币的新交易（需要 JWT）
+    """
+    options = getattr(settings, "STREAMING", {})
+    vs_currency = request.GET.get("vs_currency", "").strip().lower() or None
+    try:
+        token_ids = {
+            int(value) for value in request.GET.get("tokens", "").split(",") if value
+        }
+    except ValueError:
+        return JsonResponse({"error": "tokens must be comma-separated ids"}, status=400)
+    if not vs_currency and not token_ids:
+        return JsonResponse({"error": "Specify vs_currency and/or tokens"}, status=400)
+    if len(token_ids) > options.get("MAX_TOKENS", 50):
+        return JsonResponse({"error": "Too many tokens"}, status=400)
+    if token_ids and await _authenticate(request) is None:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    hub = get_stream_hub()
+    subscription = hub.subscribe(vs_currency=vs_currency, token_ids=token_ids)
+    heartbeat = options.get("HEARTBEAT", 15)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                message = await subscription.next(heartbeat)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield _sse(*message)
+        finally:
+            # 客户端断开时 Django 会取消该生成器
+            hub.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
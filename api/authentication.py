@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .services.auth_cache import CLAIM_FIELDS, get_revocation_list, get_user_cache
+
+"""JWT 认证：根据令牌声明构造用户，只有访问声明之外的字段时才加载数据库中的用户"""
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """签发时写入 CLAIM_FIELDS 声明，派生的访问令牌会复制这些声明"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        return token
+
+
+def _load_user(user_id):
+    user = get_user_cache().get(user_id)
+    if user is None:
+        raise AuthenticationFailed("User not found", code="user_not_found")
+    return user
+
+
+class ClaimsUser(TokenUser):
+    """由已验证令牌构造的用户
+
+    id、role、solana_address、is_active 直接来自令牌声明；访问其他字段
+    （email、is_staff 等）时才通过用户缓存加载完整的 User。需要模型实例
+    （外键赋值、save）时使用 resolve_user。
+    """
+
+    def __init__(self, token):
+        super().__init__(token)
+        self._user = None
+
+    def __str__(self):
+        return f"ClaimsUser {self.id}"
+
+    @cached_property
+    def role(self):
+        return self.token["role"]
+
+    @cached_property
+    def solana_address(self):
+        return self.token["solana_address"]
+
+    @cached_property
+    def is_active(self):
+        return self.token["is_active"]
+
+    @property
+    def is_staff(self):
+        return self.get_user().is_staff
+
+    @property
+    def is_superuser(self):
+        return self.get_user().is_superuser
+
+    def get_user(self):
+        """加载完整的 User（每个请求最多一次）"""
+        if self._user is None:
+            self._user = _load_user(self.id)
+        return self._user
+
+    def __getattr__(self, name):
+        # 私有属性（例如请求级缓存）不触发加载
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get_user(), name)
+
+
+def resolve_user(user):
+    """返回模型实例：ClaimsUser 加载完整的 User，其他用户对象原样返回"""
+    return user.get_user() if isinstance(user, ClaimsUser) else user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT 认证
+
+    - 令牌 jti 在吊销名单中时拒绝（名单在进程内缓存，不逐请求查询）
+    - JWT_AUTH['STATELESS'] 开启且令牌带有全部声明时返回 ClaimsUser，
+      认证本身不查询数据库
+    - 旧令牌缺少声明，或签发后用户的声明字段发生变化时，从用户缓存加载
+      完整的 User
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if get_revocation_list().is_revoked(
+            validated_token.get(api_settings.JTI_CLAIM)
+        ):
+            raise InvalidToken("Token has been revoked")
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        stateless = getattr(settings, "JWT_AUTH", {}).get("STATELESS", True)
+        if (
+            stateless
+            and all(field in validated_token for field in CLAIM_FIELDS)
+            and not get_revocation_list().claims_stale(
+                user_id, validated_token.get("iat")
+            )
+        ):
+            user = ClaimsUser(validated_token)
+        else:
+            user = _load_user(user_id)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from api.services.rollup_service import INTERVALS, RollupService
+
+
+class Command(BaseCommand):
+    help = "根据已有的交易记录重新生成时间序列汇总数据"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--token", type=int, action="append", dest="token_ids", help="代币 ID"
+        )
+        parser.add_argument(
+            "--interval",
+            action="append",
+            dest="intervals",
+            choices=list(INTERVALS),
+            help="汇总粒度，可重复指定（默认全部）",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        created = RollupService.backfill(
+            token_ids=options["token_ids"],
+            intervals=options["intervals"],
+            batch_size=options["batch_size"],
+        )
+        for interval, count in created.items():
+            self.stdout.write(self.style.SUCCESS(f"[{interval}] {count} buckets"))
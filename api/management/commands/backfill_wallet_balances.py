@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.services.balance_service import BalanceService
+
+
+class Command(BaseCommand):
+    help = "根据已有的交易记录重新生成钱包余额表"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--token", type=int, action="append", dest="token_ids", help="代币 ID"
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = BalanceService.rebuild(
+            token_ids=options["token_ids"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"{count} wallet balances"))
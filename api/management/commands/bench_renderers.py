@@ -0,0 +1,104 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+from api.serializers import TokenSerializer, TransactionSerializer
+from core.models import Token, Transaction, User
+
+
+class Command(BaseCommand):
+    help = (
+        "对比 JSONRenderer 与 ORJSONRenderer 渲染大批量 TokenSerializer / "
+        "TransactionSerializer 数据的耗时（使用内存中的对象，不访问数据库）"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="每种数据的行数")
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="渲染次数，取最快一次"
+        )
+
+    def handle(self, *args, **options):
+        tokens, transactions = self._build(options["rows"])
+        payloads = {
+            "TokenSerializer": TokenSerializer(tokens, many=True).data,
+            "TransactionSerializer": TransactionSerializer(
+                transactions, many=True
+            ).data,
+        }
+        renderers = {"json": JSONRenderer(), "orjson": ORJSONRenderer()}
+
+        for name, data in payloads.items():
+            timings, outputs = {}, {}
+            for label, renderer in renderers.items():
+                best = None
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    outputs[label] = renderer.render(data)
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[label] = best
+
+            # 两种渲染结果解析后必须完全一致
+            same = json.loads(outputs["json"]) == json.loads(outputs["orjson"])
+            self.stdout.write(
+                f"{name} x{options['rows']}: "
+                f"json {timings['json'] * 1000:.1f}ms "
+                f"({len(outputs['json']) / 1024:.0f} KiB), "
+                f"orjson {timings['orjson'] * 1000:.1f}ms "
+                f"({len(outputs['orjson']) / 1024:.0f} KiB), "
+                f"speedup {timings['json'] / timings['orjson']:.1f}x"
+            )
+            if same:
+                self.stdout.write(self.style.SUCCESS("  outputs are equivalent"))
+            else:
+                self.stderr.write("  outputs differ")
+
+    @staticmethod
+    def _build(count):
+        now = timezone.now()
+        owner = User(
+            id=1,
+            email="bench@example.com",
+            google_id="bench",
+            name="Bench Owner",
+            role="token_issuer",
+            solana_address="9xQeWvG816bUx9EPjHmaT23yvVM2ZWbrrpZb9PusVFin",
+            created_at=now,
+            updated_at=now,
+        )
+        tokens = []
+        for i in range(count):
+            token = Token(
+                id=i + 1,
+                name=f"Bench Token {i}",
+                symbol=f"B{i % 1000}",
+                total_supply=10**12 + i,
+                owner=owner,
+                created_at=now - timedelta(minutes=i),
+                updated_at=now,
+            )
+            # 与列表接口相同的注解字段，序列化时不查询数据库
+            token.favorited_count = i % 7
+            token.is_favorite = bool(i % 2)
+            tokens.append(token)
+
+        transactions = [
+            Transaction(
+                id=i + 1,
+                token=tokens[i % len(tokens)],
+                from_address=owner.solana_address,
+                to_address="4Nd1mBQtrMJVYVfKf2PJy9NZUZdTAsp7D4xWLs4gDB4T",
+                amount=1000 + i,
+                timestamp=now - timedelta(seconds=i),
+                created_at=now,
+                updated_at=now,
+            )
+            for i in range(count)
+        ]
+        return tokens, transactions
@@ -0,0 +1,157 @@
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.renderers import json_renderer
+from api.serializers import (
+    FlatTokenSerializer,
+    FlatTransactionHistorySerializer,
+    TokenSerializer,
+    TransactionHistorySerializer,
+)
+from api.views import TokenViewSet
+from core.models import Favorite, Permission, Token, Transaction, User
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _best(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = (
+        "校验扁平序列化与 ModelSerializer 的输出逐字节一致，并对比代币列表与"
+        "交易历史的序列化耗时（示例数据在事务内写入，结束后回滚）"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="代币与交易的行数")
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="执行次数，取最快一次"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user, token = self._seed(options["rows"])
+                ok = self._report(user, token, options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+        if not ok:
+            self.stderr.write("Flat serializer output differs from ModelSerializer")
+
+    def _seed(self, count):
+        now = timezone.now()
+        owners = [
+            User.objects.create_user(
+                email=f"bench-serializers-{i}@example.com",
+                google_id=f"bench-serializers-{i}",
+                role="token_issuer",
+                solana_address="9xQeWvG816bUx9EPjHmaT23yvVM2ZWbrrpZb9PusVFin",
+            )
+            for i in range(10)
+        ]
+        tokens = Token.objects.bulk_create(
+            Token(
+                name=f"Bench {i}",
+                symbol=f"B{i % 1000}",
+                total_supply=10**12 + i,
+                owner=owners[i % len(owners)],
+                # 与下面写入的收藏一致（bulk_create 不触发收藏数的维护）
+                favorited_count=1 if i % 3 == 0 else 0,
+            )
+            for i in range(count)
+        )
+        user = owners[0]
+        Favorite.objects.bulk_create(
+            Favorite(user=user, token=token) for token in tokens[::3]
+        )
+        Permission.objects.bulk_create(
+            Permission(user=user, token=token, can_manage=True)
+            for token in tokens[1::5]
+        )
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    token=tokens[0],
+                    from_address=f"sender{i % 500:038d}",
+                    to_address=f"receiver{i % 800:036d}",
+                    amount=i + 1,
+                    timestamp=now - timedelta(seconds=i),
+                )
+                for i in range(count)
+            ),
+            batch_size=5000,
+        )
+        return user, tokens[0]
+
+    def _report(self, user, token, repeat):
+        render = json_renderer().render
+        request = SimpleNamespace(user=user)
+        # 与 TokenViewSet.list / history 相同的查询
+        tokens = TokenViewSet(
+            request=request, format_kwarg=None, action="list"
+        ).get_queryset()
+        flat_tokens = FlatTokenSerializer(user)
+        history = (
+            Transaction.objects.filter(token=token)
+            .order_by("-timestamp", "-id")
+            .values(*FlatTransactionHistorySerializer.fields)
+        )
+        flat_history = FlatTransactionHistorySerializer()
+
+        cases = {
+            "tokens list": (
+                lambda: list(tokens.all()),
+                lambda rows: TokenSerializer(
+                    rows, many=True, context={"request": request}
+                ).data,
+                lambda: list(flat_tokens.values(tokens.all())),
+                lambda rows: [flat_tokens.to_representation(row) for row in rows],
+            ),
+            "history": (
+                lambda: list(history.all()),
+                lambda rows: TransactionHistorySerializer(rows, many=True).data,
+                lambda: list(history.all()),
+                lambda rows: [flat_history.to_representation(row) for row in rows],
+            ),
+        }
+
+        ok = True
+        for name, (fetch, serialize, flat_fetch, flat_serialize) in cases.items():
+            # 行预先读出，只计序列化本身；end-to-end 包括查询
+            rows, flat_rows = fetch(), flat_fetch()
+            model_time, model_data = _best(lambda: serialize(rows), repeat)
+            flat_time, flat_data = _best(lambda: flat_serialize(flat_rows), repeat)
+            model_total, _ = _best(lambda: serialize(fetch()), repeat)
+            flat_total, _ = _best(lambda: flat_serialize(flat_fetch()), repeat)
+
+            same = render(model_data) == render(flat_data)
+            ok = ok and same
+            self.stdout.write(
+                f"{name} x{len(rows)}: "
+                f"serialize ModelSerializer {model_time * 1000:.1f}ms, "
+                f"flat {flat_time * 1000:.1f}ms, "
+                f"speedup {model_time / flat_time:.1f}x; "
+                f"end-to-end {model_total * 1000:.1f}ms vs {flat_total * 1000:.1f}ms, "
+                f"speedup {model_total / flat_total:.1f}x"
+            )
+            if same:
+                self.stdout.write(self.style.SUCCESS("  JSON output is identical"))
+            else:
+                self.stderr.write("  JSON output differs")
+        return ok
@@ -0,0 +1,118 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Favorite, Permission, Token, Transaction, User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "输出主要查询（交易历史、钱包活动、收藏、权限、代币列表）的执行计划与耗时；"
+        "在 migrate core 0004 与最新迁移下分别运行即可对比索引调整前后的效果"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="临时写入的示例交易数量（在事务内写入，结束后回滚）",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="每个查询的执行次数")
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="使用 EXPLAIN ANALYZE（仅 PostgreSQL）",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options["seed"]:
+                    self._seed(options["seed"])
+                self._report(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count):
+        user = User.objects.create_user(
+            email="explain-queries@example.com", google_id="explain-queries"
+        )
+        tokens = Token.objects.bulk_create(
+            Token(name=f"Bench {i}", symbol="BNCH", total_supply=0, owner=user)
+            for i in range(50)
+        )
+        Favorite.objects.bulk_create(Favorite(user=user, token=t) for t in tokens)
+        Permission.objects.bulk_create(
+            Permission(user=user, token=t, can_manage=True) for t in tokens[:10]
+        )
+        now = timezone.now()
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    token=tokens[i % len(tokens)],
+                    from_address=f"sender{i % 500:038d}",
+                    to_address=f"receiver{i % 800:036d}",
+                    amount=i + 1,
+                    timestamp=now - timedelta(seconds=i),
+                )
+                for i in range(count)
+            ),
+            batch_size=5000,
+        )
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+    def _sample(self):
+        tx = Transaction.objects.order_by("-id").first()
+        favorite = Favorite.objects.order_by("-id").first()
+        permission = Permission.objects.order_by("-id").first()
+        token_id = tx.token_id if tx else 0
+        address = tx.from_address if tx else ""
+        user_id = favorite.user_id if favorite else 0
+        return {
+            "history": Transaction.objects.filter(token_id=token_id)
+            .order_by("-timestamp", "-id")
+            .values("id", "from_address", "to_address", "amount", "timestamp")[:100],
+            "wallet activity": Transaction.objects.filter(
+                Q(from_address=address) | Q(to_address=address)
+            ).order_by("-timestamp")[:100],
+            "favorite check": Favorite.objects.filter(
+                user_id=user_id, token_id=favorite.token_id if favorite else 0
+            ),
+            "user favorites": Favorite.objects.filter(user_id=user_id).values_list(
+                "token_id", flat=True
+            ),
+            "user permissions": Permission.objects.filter(
+                user_id=permission.user_id if permission else 0, can_manage=True
+            ).values_list("token_id", flat=True),
+            "active token list": Token.objects.filter(is_active=True).order_by("id")[
+                :100
+            ],
+        }
+
+    def _report(self, options):
+        explain_options = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options = {"analyze": True, "buffers": True}
+
+        for name, queryset in self._sample().items():
+            plan = queryset.explain(**explain_options)
+            started = time.perf_counter()
+            for _ in range(options["repeat"]):
+                list(queryset.all())
+            elapsed = (time.perf_counter() - started) / max(options["repeat"], 1)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+            self.stdout.write(plan)
+            self.stdout.write(self.style.SUCCESS(f"avg {elapsed * 1000:.3f} ms"))
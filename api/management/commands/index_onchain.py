@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.services.onchain_indexer import OnchainIndexer
+
+
+class Command(BaseCommand):
+    help = "索引被跟踪代币（Token.mint_address）与指定地址的链上 SPL 转账"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--address",
+            action="append",
+            dest="addresses",
+            help="额外跟踪的地址（钱包或代币账户），可重复指定",
+        )
+        parser.add_argument(
+            "--rpc-url", help="RPC 节点地址，默认使用 ONCHAIN_INDEXER['RPC_URL']"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="每个批量请求包含的 getTransaction 调用数"
+        )
+        parser.add_argument("--concurrency", type=int, help="同时进行的批量请求数")
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="循环索引间隔秒数；0 表示只执行一次",
+        )
+
+    def handle(self, *args, **options):
+        indexer = OnchainIndexer(
+            rpc_url=options["rpc_url"],
+            batch_size=options["batch_size"],
+            concurrency=options["concurrency"],
+        )
+        while True:
+            results = indexer.run(options["addresses"])
+            if not results:
+                self.stderr.write(
+                    "No tracked addresses: set Token.mint_address or pass --address"
+                )
+            for address, result in results.items():
+                if isinstance(result, int):
+                    self.stdout.write(f"[{address}] {result} new transfers")
+                else:
+                    self.stderr.write(f"[{address}] failed: {result}")
+
+            stats = indexer.stats
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{stats['transactions']} transactions, "
+                    f"{stats['inserted']} transfers inserted, "
+                    f"{stats['errors']} errors in {stats['elapsed']:.1f}s "
+                    f"({indexer.tx_per_second:.1f} tx/s)"
+                )
+            )
+
+            if options["interval"] <= 0:
+                break
+            time.sleep(options["interval"])
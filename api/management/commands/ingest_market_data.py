@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.services.market_snapshot import MarketIngestionService
+
+
+class Command(BaseCommand):
+    help = "拉取 CoinGecko solana-ecosystem 完整代币列表并写入本地快照"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--vs-currency",
+            action="append",
+            dest="vs_currencies",
+            help="计价货币，可重复指定（默认 usd）",
+        )
+        parser.add_argument("--per-page", type=int, default=250)
+        parser.add_argument("--max-pages", type=int, default=None)
+        parser.add_argument(
+            "--page-delay",
+            type=float,
+            default=1.0,
+            help="分页请求之间的间隔秒数，避免触发 CoinGecko 限流",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="循环刷新间隔秒数；0 表示只执行一次",
+        )
+
+    def handle(self, *args, **options):
+        vs_currencies = options["vs_currencies"] or ["usd"]
+        service = MarketIngestionService(page_delay=options["page_delay"])
+
+        while True:
+            for vs_currency in vs_currencies:
+                started = time.monotonic()
+                snapshot = service.refresh(
+                    vs_currency=vs_currency,
+                    per_page=options["per_page"],
+                    max_pages=options["max_pages"],
+                )
+                elapsed = time.monotonic() - started
+                if snapshot.status == "success":
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f"[{vs_currency}] snapshot {snapshot.id}: "
+                            f"{snapshot.token_count} tokens, "
+                            f"{snapshot.upserted_count} upserted, "
+                            f"{snapshot.removed_count} removed ({elapsed:.1f}s)"
+                        )
+                    )
+                else:
+                    self.stderr.write(
+                        f"[{vs_currency}] snapshot {snapshot.id} failed: "
+                        f"{snapshot.error}; previous snapshot is still served"
+                    )
+
+            if options["interval"] <= 0:
+                break
+            time.sleep(options["interval"])
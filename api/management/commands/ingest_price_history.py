@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.services.price_history import PriceHistoryIngestionService
+from core.models import MarketToken
+
+
+class Command(BaseCommand):
+    help = "从 CoinGecko market_chart 导入历史价格"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--coin-id",
+            action="append",
+            dest="coin_ids",
+            help="CoinGecko 币种 ID，可重复指定",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=0,
+            help="导入本地市场快照中排名前 N 的币种",
+        )
+        parser.add_argument("--vs-currency", default="usd")
+        parser.add_argument("--days", default="365", help="天数或 max")
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=1.0,
+            help="币种之间的请求间隔秒数，避免触发 CoinGecko 限流",
+        )
+
+    def handle(self, *args, **options):
+        vs_currency = options["vs_currency"].lower()
+        coin_ids = list(options["coin_ids"] or [])
+        if options["top"]:
+            coin_ids += list(
+                MarketToken.objects.filter(vs_currency=vs_currency)
+                .order_by("rank")
+                .values_list("token_address", flat=True)[: options["top"]]
+            )
+        if not coin_ids:
+            self.stderr.write("Specify --coin-id or --top")
+            return
+
+        service = PriceHistoryIngestionService()
+        for index, coin_id in enumerate(dict.fromkeys(coin_ids)):
+            if index and options["delay"]:
+                time.sleep(options["delay"])
+            try:
+                count = service.ingest(coin_id, vs_currency, options["days"])
+            except Exception as e:
+                self.stderr.write(f"[{coin_id}] failed: {e}")
+                continue
+            self.stdout.write(self.style.SUCCESS(f"[{coin_id}] {count} price points"))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.services.token_service import TokenService
+
+
+class Command(BaseCommand):
+    help = "核对代币供应量流水之和与 total_supply 是否一致"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--token", type=int, action="append", dest="token_ids", help="代币 ID"
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="为不一致的代币追加 adjust 流水，使流水与 total_supply 对齐",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="循环核对间隔秒数；0 表示只执行一次",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            mismatches = TokenService.reconcile_supply(
+                token_ids=options["token_ids"], fix=options["fix"]
+            )
+            if not mismatches:
+                self.stdout.write(self.style.SUCCESS("Supply ledger is consistent"))
+            for item in mismatches:
+                self.stderr.write(
+                    f"Token {item['token_id']}: total_supply={item['total_supply']} "
+                    f"ledger={item['ledger_supply']} "
+                    f"difference={item['difference']:+d}"
+                    + (" (adjusted)" if options["fix"] else "")
+                )
+
+            if options["interval"] <= 0:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,49 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.services.performance_pipeline import PerformancePipeline
+from api.services.price_service import HistoricalPriceProvider
+from core.models import WalletBalance
+
+
+class Command(BaseCommand):
+    help = "批量计算钱包收益指标（盈亏、时间加权收益、波动率、最大回撤），按行输出 JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--address", action="append", dest="addresses", help="钱包地址，可重复指定"
+        )
+        parser.add_argument(
+            "--all", action="store_true", help="计算余额表中出现过的所有地址"
+        )
+        parser.add_argument("--vs-currency", default="usd")
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        addresses = list(options["addresses"] or [])
+        if options["all"]:
+            addresses += list(
+                WalletBalance.objects.values_list("address", flat=True)
+                .distinct()
+                .order_by("address")
+            )
+        if not addresses:
+            self.stderr.write("Specify --address or --all")
+            return
+
+        pipeline = PerformancePipeline(
+            price_provider=HistoricalPriceProvider(options["vs_currency"]),
+            chunk_size=options["chunk_size"],
+        )
+        started = time.monotonic()
+        results = pipeline.score_many(addresses)
+        for address, metrics in results.items():
+            self.stdout.write(
+                json.dumps({"address": address, **metrics}, cls=JSONEncoder)
+            )
+        self.stderr.write(
+            f"Scored {len(results)} wallets in {time.monotonic() - started:.2f}s"
+        )
@@ -0,0 +1,37 @@
+"""
+渲染器模块：基于 orjson 的 JSON 渲染器
+"""
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson 不支持的类型（Decimal、timedelta、惰性翻译字符串等）交给 DRF 的编码器处理，
+# 保证输出与 JSONRenderer 一致
+_fallback_encoder = JSONEncoder()
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class ORJSONRenderer(JSONRenderer):
+    """使用 orjson 序列化，datetime/UUID/NumPy 数组在 C 层直接编码
+
+    与 JSONRenderer 相同的媒体类型与格式；请求指定 indent 时输出两空格缩进。
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        options = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_fallback_encoder.default, option=options)
+
+
+def json_renderer():
+    """返回 DEFAULT_RENDERER_CLASSES 中配置的 JSON 渲染器实例（用于流式导出）"""
+    for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES:
+        if renderer_class.format == "json":
+            return renderer_class()
+    return ORJSONRenderer()
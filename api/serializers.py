@@ -1,7 +1,12 @@
+from django.utils import timezone
 from rest_framework import serializers
 
 from core.models import Favorite, Permission, Token, Transaction, User
 
+from .services.address_validation import is_valid_address
+from .services.favorite_service import get_favorite_service
+from .services.permission_service import get_permission_resolver
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -28,7 +33,7 @@ class TokenSerializer(serializers.ModelSerializer):
         queryset=User.objects.all(), write_only=True, source="owner"
     )
     is_favorite = serializers.SerializerMethodField()
-    favorited_count = serializers.SerializerMethodField()
+    can_manage = serializers.SerializerMethodField()
 
     class Meta:
         model = Token
@@ -40,26 +45,57 @@ class TokenSerializer(serializers.ModelSerializer):
             "owner",
             "owner_id",
             "is_active",
+            "mint_address",
             "created_at",
             "updated_at",
             "is_favorite",
             "favorited_count",
+            "can_manage",
+        )
+        read_only_fields = (
+            "created_at",
+            "updated_at",
+            "id",
+            "owner",
+            "favorited_count",
         )
-        read_only_fields = ("created_at", "updated_at", "id", "owner")
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # 创建之后 total_supply 只能通过 manage（增发/销毁）修改
+        if self.instance is not None:
+            fields["total_supply"].read_only = True
+        return fields
+
+    def update(self, instance, validated_data):
+        # 只写入请求修改的列：整行保存会用读取时的 total_supply 覆盖
+        # 并发的增发/销毁（F() 更新）
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        instance.refresh_from_db(fields=["total_supply"])
+        return instance
+
+    def validate_mint_address(self, value):
+        if value and not is_valid_address(value):
+            raise serializers.ValidationError("Invalid Solana address.")
+        # 空字符串按未设置处理，避免与唯一约束冲突
+        return value or None
 
     def get_is_favorite(self, obj):
+        # 已设置的值优先；否则查用户的收藏集合（每个请求只加载一次，不逐行查询）
+        annotated = getattr(obj, "is_favorite", None)
+        if annotated is not None:
+            return annotated
         request = self.context.get("request")
-        if request and hasattr(request, "user") and request.user.is_authenticated:
-            try:
-                return Favorite.objects.filter(
-                    user_id=request.user.id, token=obj
-                ).exists()
-            except AttributeError:
-                return False
-        return False
+        user = getattr(request, "user", None)
+        return obj.pk in get_favorite_service().favorite_token_ids(user)
 
-    def get_favorited_count(self, obj):
-        return obj.favorited_by.count()
+    def get_can_manage(self, obj):
+        # 用户的 Permission 记录每个请求只加载一次，列表中不会逐行查询
+        request = self.context.get("request")
+        user = getattr(request, "user", None)
+        return get_permission_resolver().can_manage_token(user, obj)
 
 
 class TransactionSerializer(serializers.ModelSerializer):
@@ -78,10 +114,20 @@ class TransactionSerializer(serializers.ModelSerializer):
             "to_address",
             "amount",
             "timestamp",
+            "signature",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("created_at", "updated_at", "id", "token")
+        read_only_fields = ("created_at", "updated_at", "id", "token", "signature")
+
+
+class TransactionHistorySerializer(serializers.ModelSerializer):
+    """交易历史的精简结构：代币已由 URL 确定，不再嵌套 token"""
+
+    class Meta:
+        model = Transaction
+        fields = ("id", "from_address", "to_address", "amount", "timestamp")
+        read_only_fields = fields
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
@@ -134,3 +180,108 @@ class PermissionSerializer(serializers.ModelSerializer):
             "updated_at",
         )
         read_only_fields = ("created_at", "updated_at", "id", "user", "token")
+
+
+# ---- 只读的扁平序列化：热点列表接口直接由 values() 行构造输出 ----
+
+
+def _output_timezone():
+    """当前时区为 UTC 时返回 None：数据库读出的 datetime 已是 UTC，无需再转换"""
+    if timezone.get_current_timezone_name() == "UTC":
+        return None
+    return timezone.get_current_timezone()
+
+
+def _datetime(value, tz):
+    """与 DRF DateTimeField 相同的输出：转换到当前时区的 ISO 8601，UTC 以 Z 结尾"""
+    if value is None:
+        return None
+    if tz is not None:
+        value = value.astimezone(tz)
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+class FlatTokenSerializer:
+    """代币列表的只读序列化，输出与 TokenSerializer 完全一致
+
+    直接读取 values() 行（owner 的字段以 owner__ 前缀联表读取），不创建
+    模型实例，也不经过 DRF 的逐字段处理。字段集合来自 TokenSerializer
+    与 UserSerializer 的 Meta.fields。
+    """
+
+    fields = tuple(f for f in TokenSerializer.Meta.fields if f != "owner_id")
+    owner_fields = UserSerializer.Meta.fields
+    # 由收藏集合或权限解析器提供、不是模型列的字段
+    computed_fields = ("owner", "is_favorite", "can_manage")
+
+    def __init__(self, user=None):
+        self.tz = _output_timezone()
+        self.favorites = get_favorite_service().favorite_token_ids(user)
+        self.can_manage = get_permission_resolver().manage_checker(user)
+        self._owners = {}
+
+    def values(self, queryset):
+        """TokenViewSet.get_queryset() 的结果转换为本序列化所需的 values() 查询"""
+        columns = [f for f in self.fields if f not in self.computed_fields]
+        return queryset.values(
+            *columns,
+            "owner_id",
+            *(f"owner__{field}" for field in self.owner_fields),
+        )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "symbol": row["symbol"],
+            "total_supply": row["total_supply"],
+            "owner": self._owner(row),
+            "is_active": row["is_active"],
+            "mint_address": row["mint_address"],
+            "created_at": _datetime(row["created_at"], self.tz),
+            "updated_at": _datetime(row["updated_at"], self.tz),
+            "is_favorite": row["id"] in self.favorites,
+            "favorited_count": row["favorited_count"],
+            "can_manage": self.can_manage(row["id"], row["owner_id"]),
+        }
+
+    def _owner(self, row):
+        # 同一所有者的多个代币共用一份 owner 输出
+        owner = self._owners.get(row["owner_id"])
+        if owner is None:
+            owner = self._owners[row["owner_id"]] = {
+                "id": row["owner__id"],
+                "user_type": row["owner__user_type"],
+                "google_id": row["owner__google_id"],
+                "email": row["owner__email"],
+                "solana_address": row["owner__solana_address"],
+                "name": row["owner__name"],
+                "avatar_url": row["owner__avatar_url"],
+                "role": row["owner__role"],
+                "is_active": row["owner__is_active"],
+                "created_at": _datetime(row["owner__created_at"], self.tz),
+                "updated_at": _datetime(row["owner__updated_at"], self.tz),
+            }
+        return owner
+
+    def serialize(self, queryset):
+        return [self.to_representation(row) for row in self.values(queryset)]
+
+
+class FlatTransactionHistorySerializer:
+    """交易历史的只读序列化，输出与 TransactionHistorySerializer 完全一致"""
+
+    fields = TransactionHistorySerializer.Meta.fields
+
+    def __init__(self):
+        self.tz = _output_timezone()
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "from_address": row["from_address"],
+            "to_address": row["to_address"],
+            "amount": row["amount"],
+            "timestamp": _datetime(row["timestamp"], self.tz),
+        }
@@ -0,0 +1,63 @@
+from solders.pubkey import Pubkey
+
+"""地址校验：在任何 RPC 请求之前，离线完成 Solana 地址的格式校验"""
+
+BASE58_ALPHABET = frozenset(
+    "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+)
+
+# 32 字节公钥的 base58 编码长度范围
+MIN_ADDRESS_LENGTH = 32
+MAX_ADDRESS_LENGTH = 44
+
+INVALID_TYPE = "invalid_type"
+INVALID_LENGTH = "invalid_length"
+INVALID_BASE58 = "invalid_base58"
+OFF_CURVE = "off_curve"
+
+
+def validate_address(address, require_on_curve=False):
+    """校验单个地址
+
+    依次检查：字符串长度 -> base58 字符集 -> 解码为 32 字节公钥 ->
+    （可选）是否在 ed25519 曲线上。钱包地址都在曲线上，PDA 不在。
+
+    Args:
+        address: 待校验的地址
+        require_on_curve: 是否要求地址在 ed25519 曲线上
+
+    Returns:
+        str: 失败原因；None 表示校验通过
+    """
+    if not isinstance(address, str):
+        return INVALID_TYPE
+    if not MIN_ADDRESS_LENGTH <= len(address) <= MAX_ADDRESS_LENGTH:
+        return INVALID_LENGTH
+    if not BASE58_ALPHABET.issuperset(address):
+        return INVALID_BASE58
+    try:
+        pubkey = Pubkey.from_string(address)
+    except ValueError:
+        # 字符合法但解码后不是 32 字节
+        return INVALID_LENGTH
+    if require_on_curve and not pubkey.is_on_curve():
+        return OFF_CURVE
+    return None
+
+
+def is_valid_address(address, require_on_curve=False):
+    return validate_address(address, require_on_curve) is None
+
+
+def validate_addresses(addresses, require_on_curve=False):
+    """批量校验地址，重复地址只校验一次
+
+    Returns:
+        dict: {address: 失败原因或 None}
+    """
+    results = {}
+    for address in addresses:
+        key = address if isinstance(address, str) else repr(address)
+        if key not in results:
+            results[key] = validate_address(address, require_on_curve)
+    return results
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .http_client import CircuitOpenError, get_http_client
+from .market_service import MarketService
+from .solana_rpc import get_rpc_gateway
+
+"""异步市场服务：并发获取 CoinGecko 数据与链上数据，供 ASGI 异步视图使用
+
+链上请求统一经过进程级 Solana RPC 网关（在线程池中执行），与同步服务共享
+连接池、批量合并与限流。
+"""
+
+logger = logging.getLogger(__name__)
+
+# 每个事件循环共享一个 httpx 客户端，复用连接池
+_loop_clients = weakref.WeakKeyDictionary()
+
+
+def _get_loop_client():
+    loop = asyncio.get_running_loop()
+    http = _loop_clients.get(loop)
+    if http is None:
+        options = getattr(settings, "HTTP_CLIENTS", {}).get("coingecko", {})
+        pool_size = options.get("POOL_MAXSIZE", 20)
+        http = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                options.get("READ_TIMEOUT", 10),
+                connect=options.get("CONNECT_TIMEOUT", 3.05),
+            ),
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=1),
+        )
+        _loop_clients[loop] = http
+    return http
+
+
+class AsyncMarketService:
+    """MarketService 的异步版本
+
+    CoinGecko 请求与熔断器共享同步客户端的状态，上游故障时同样快速失败。
+    """
+
+    def __init__(self):
+        self.coingecko_api = "https://api.coingecko.com/api/v3"
+        self.http = _get_loop_client()
+        self.rpc = get_rpc_gateway()
+        self.breaker = get_http_client("coingecko").breaker
+
+    async def _get_json(self, url, params=None):
+        if not self.breaker.allow():
+            raise CircuitOpenError("coingecko circuit is open")
+        settled = False
+        try:
+            response = await self.http.get(url, params=params)
+            if response.status_code >= 500 or response.status_code == 429:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            settled = True
+        finally:
+            # 传输错误、取消（CancelledError）等任何异常都计为失败，
+            # 保证 half-open 试探标记总会被清除
+            if not settled:
+                self.breaker.record_failure()
+        response.raise_for_status()
+        return response.json()
+
+    async def get_top_tokens(self, vs_currency="usd", page=1, per_page=20):
+        """获取热门代币列表（复用同步服务的缓存，在线程中执行）"""
+        return await sync_to_async(MarketService().get_top_tokens)(
+            vs_currency=vs_currency, page=page, per_page=per_page
+        )
+
+    async def get_token_details(self, token_address):
+        """并发获取 CoinGecko 详情与链上供应量
+
+        Returns:
+            dict: 与 MarketService.get_token_details 相同的结构
+            None: CoinGecko 请求失败
+        """
+        token_data, onchain_data = await asyncio.gather(
+            self._get_json(f"{self.coingecko_api}/coins/{token_address}"),
+            self.get_token_onchain_data(token_address),
+            return_exceptions=True,
+        )
+        if isinstance(token_data, Exception):
+            logger.error(f"Error fetching token details: {token_data}")
+            return None
+        if isinstance(onchain_data, Exception):
+            onchain_data = None
+        return MarketService.normalize_token_details(
+            token_address, token_data, onchain_data
+        )
+
+    async def get_token_onchain_data(self, token_address):
+        supplies = await self.get_tokens_onchain_data([token_address])
+        return supplies[token_address]
+
+    async def get_tokens_onchain_data(self, token_addresses):
+        """批量获取链上供应量：每 100 个 Mint 一个 getMultipleAccounts 调用，
+        全部放进一次 JSON-RPC 批量请求
+
+        Returns:
+            dict: {token_address: onchain_data | None}
+        """
+        try:
+            return await sync_to_async(
+                self.rpc.get_token_supplies, thread_sensitive=False
+            )(token_addresses)
+        except Exception as e:
+            logger.warning(f"Error fetching onchain data: {e}")
+            return dict.fromkeys(token_addresses)
+
+    async def enrich_with_onchain(self, tokens):
+        """为一页代币补充链上供应量
+
+        Args:
+            tokens: get_top_tokens 返回的代币字典列表
+
+        Returns:
+            list: 新的代币字典列表，每项增加 onchain_data 字段
+        """
+        supplies = await self.get_tokens_onchain_data(
+            [token["token_address"] for token in tokens]
+        )
+        return [
+            {**token, "onchain_data": supplies.get(token["token_address"])}
+            for token in tokens
+        ]
+
+    async def get_top_tokens_with_onchain(self, vs_currency="usd", page=1, per_page=20):
+        result = await self.get_top_tokens(vs_currency, page, per_page)
+        return {**result, "tokens": await self.enrich_with_onchain(result["tokens"])}
@@ -0,0 +1,182 @@
+import copy
+import threading
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import TokenRevocation, User
+
+from .cache_backends import build_cache_backend
+
+"""认证缓存：JWT 认证使用的用户行短 TTL 缓存，以及进程内缓存的令牌吊销名单"""
+
+# 写入访问令牌、认证时无需查询数据库即可使用的用户字段
+CLAIM_FIELDS = ("role", "solana_address", "is_active")
+
+
+def _options():
+    return getattr(settings, "JWT_AUTH", {})
+
+
+def _user_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+class UserCache:
+    """按 ID 缓存用户行；用户保存或删除时失效"""
+
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+
+    def get(self, user_id):
+        """返回用户对象（每次返回副本，请求之间不共享实例）；用户不存在时返回 None"""
+        user = self.backend.get(_user_key(user_id))
+        if user is None:
+            # 缓存的用户行总是从主库读取，避免把副本上的旧角色/状态缓存一个 TTL
+            user = User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id).first()
+            if user is None:
+                return None
+            self.backend.set(_user_key(user_id), user, self.ttl)
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        self.backend.delete(_user_key(user_id))
+
+
+class RevocationList:
+    """令牌吊销名单：每个进程持有未过期记录的快照，每 ttl 秒重新加载一次
+
+    认证时只查询内存中的快照；本进程内的吊销立即生效，其他进程最多延迟
+    ttl 秒。
+    """
+
+    def __init__(self, ttl=5):
+        self.ttl = ttl
+        self._jtis = frozenset()
+        self._claims_before = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _snapshot(self):
+        now = time.monotonic()
+        if self._loaded_at is not None and now - self._loaded_at < self.ttl:
+            return self._jtis, self._claims_before
+        with self._lock:
+            if self._loaded_at is None or now - self._loaded_at >= self.ttl:
+                jtis, claims_before = set(), {}
+                # 从主库读取，刚写入的吊销记录不会因副本延迟而漏掉
+                rows = (
+                    TokenRevocation.objects.using(DEFAULT_DB_ALIAS)
+                    .filter(expires_at__gt=timezone.now())
+                    .values_list("jti", "user_id", "claims_before")
+                )
+                for jti, user_id, before in rows:
+                    if jti:
+                        jtis.add(jti)
+                    elif before is not None:
+                        timestamp = before.timestamp()
+                        claims_before[user_id] = max(
+                            timestamp, claims_before.get(user_id, timestamp)
+                        )
+                self._jtis, self._claims_before = frozenset(jtis), claims_before
+                self._loaded_at = now
+        return self._jtis, self._claims_before
+
+    def is_revoked(self, jti):
+        return bool(jti) and jti in self._snapshot()[0]
+
+    def claims_stale(self, user_id, issued_at):
+        """令牌签发后用户的声明字段是否发生过变化（缺少 iat 时视为过时）"""
+        before = self._snapshot()[1].get(user_id)
+        if before is None:
+            return False
+        return issued_at is None or issued_at < before
+
+    def revoke(self, token):
+        """吊销单个访问令牌直到其过期"""
+        jti = token.get(settings.SIMPLE_JWT.get("JTI_CLAIM", "jti"))
+        user_id = token.get(settings.SIMPLE_JWT.get("USER_ID_CLAIM", "user_id"))
+        if not jti or user_id is None:
+            return
+        TokenRevocation.objects.get_or_create(
+            jti=jti,
+            defaults={
+                "user_id": user_id,
+                "expires_at": datetime.fromtimestamp(token["exp"], dt_timezone.utc),
+            },
+        )
+        self._purge()
+        with self._lock:
+            self._jtis = self._jtis | {jti}
+
+    def mark_claims_stale(self, user_id):
+        """此前签发给该用户的令牌不再使用令牌中的声明"""
+        now = timezone.now()
+        TokenRevocation.objects.create(
+            user_id=user_id,
+            claims_before=now,
+            expires_at=now + settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"],
+        )
+        self._purge()
+        with self._lock:
+            self._claims_before = {**self._claims_before, user_id: now.timestamp()}
+
+    @staticmethod
+    def _purge():
+        TokenRevocation.objects.filter(expires_at__lte=timezone.now()).delete()
+
+
+_user_cache = None
+_revocations = None
+_lock = threading.Lock()
+
+
+def get_user_cache():
+    """获取进程级共享的用户缓存（按 settings.JWT_AUTH['USER_CACHE'] 配置）"""
+    global _user_cache
+    if _user_cache is None:
+        with _lock:
+            if _user_cache is None:
+                options = _options().get("USER_CACHE", {})
+                _user_cache = UserCache(
+                    backend=build_cache_backend(options, key_prefix="sol:"),
+                    ttl=options.get("TTL", 60),
+                )
+    return _user_cache
+
+
+def get_revocation_list():
+    """获取进程级共享的令牌吊销名单"""
+    global _revocations
+    if _revocations is None:
+        with _lock:
+            if _revocations is None:
+                _revocations = RevocationList(ttl=_options().get("DENY_LIST_TTL", 5))
+    return _revocations
+
+
+@receiver(pre_save, sender=User)
+def mark_claims_stale(sender, instance, raw=False, update_fields=None, **kwargs):
+    # 只有声明字段变化时才需要；只更新 last_login 等字段时不查询
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(CLAIM_FIELDS):
+        return
+    previous = User.objects.filter(pk=instance.pk).values(*CLAIM_FIELDS).first()
+    if previous and any(
+        previous[field] != getattr(instance, field) for field in CLAIM_FIELDS
+    ):
+        get_revocation_list().mark_claims_stale(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    get_user_cache().invalidate(instance.pk)
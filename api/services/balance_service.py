@@ -0,0 +1,180 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    BigIntegerField,
+    Case,
+    Count,
+    F,
+    IntegerField,
+    Sum,
+    Value,
+    When,
+)
+
+from core.models import Transaction, WalletBalance
+
+"""钱包余额服务：按 (地址, 代币) 增量维护余额与累计流入/流出"""
+
+# 一条 UPDATE 中 CASE 分支（余额行）的最大数量
+UPDATE_CHUNK_SIZE = 500
+
+# 已存在的行按 (字段, 增量, 类型) 累加
+_INCREMENTS = (
+    ("balance", lambda d: d["inflow"] - d["outflow"], BigIntegerField()),
+    ("inflow", lambda d: d["inflow"], BigIntegerField()),
+    ("outflow", lambda d: d["outflow"], BigIntegerField()),
+    ("tx_count", lambda d: d["tx_count"], IntegerField()),
+)
+
+
+class BalanceService:
+    @staticmethod
+    def _deltas(transactions):
+        deltas = defaultdict(lambda: {"inflow": 0, "outflow": 0, "tx_count": 0})
+        for tx in transactions:
+            received = deltas[(tx.to_address, tx.token_id)]
+            received["inflow"] += tx.amount
+            received["tx_count"] += 1
+            sent = deltas[(tx.from_address, tx.token_id)]
+            sent["outflow"] += tx.amount
+            if tx.from_address != tx.to_address:
+                sent["tx_count"] += 1
+        return deltas
+
+    @staticmethod
+    def record(transactions):
+        """把新写入的交易累加到收发双方的余额
+
+        尚不存在的 (地址, 代币) 行直接以最终值批量插入；已存在的行用 F()
+        表达式原地累加（每 UPDATE_CHUNK_SIZE 行一条 UPDATE，CASE 按行给出
+        增量），并发写入同一行时不会丢失更新。
+
+        Args:
+            transactions: 已保存的 Transaction 对象列表
+        """
+        deltas = BalanceService._deltas(transactions)
+        if not deltas:
+            return
+
+        with transaction.atomic():
+            row_ids = BalanceService._row_ids(deltas)
+            missing = [key for key in deltas if key not in row_ids]
+            try:
+                with transaction.atomic():
+                    WalletBalance.objects.bulk_create(
+                        [
+                            WalletBalance(
+                                address=address,
+                                token_id=token_id,
+                                balance=deltas[(address, token_id)]["inflow"]
+                                - deltas[(address, token_id)]["outflow"],
+                                **deltas[(address, token_id)],
+                            )
+                            for address, token_id in missing
+                        ]
+                    )
+            except IntegrityError:
+                # 并发请求先插入了部分行：补齐空行后统一走累加
+                WalletBalance.objects.bulk_create(
+                    [
+                        WalletBalance(address=address, token_id=token_id)
+                        for address, token_id in missing
+                    ],
+                    ignore_conflicts=True,
+                )
+                row_ids.update(BalanceService._row_ids(missing))
+
+            # 按主键顺序加锁并累加：并发批次以相同顺序锁行，不会互相死锁
+            pks = sorted(row_ids.values())
+            deltas_by_pk = {pk: deltas[key] for key, pk in row_ids.items()}
+            for offset in range(0, len(pks), UPDATE_CHUNK_SIZE):
+                chunk = pks[offset : offset + UPDATE_CHUNK_SIZE]
+                list(
+                    WalletBalance.objects.select_for_update()
+                    .filter(pk__in=chunk)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)
+                )
+                WalletBalance.objects.filter(pk__in=chunk).update(
+                    **{
+                        field: F(field)
+                        + Case(
+                            *(
+                                When(pk=pk, then=Value(value(deltas_by_pk[pk])))
+                                for pk in chunk
+                            ),
+                            output_field=output_field,
+                        )
+                        for field, value, output_field in _INCREMENTS
+                    }
+                )
+
+    @staticmethod
+    def _row_ids(keys):
+        """一次查询读出 {(address, token_id): WalletBalance ID}"""
+        keys = set(keys)
+        rows = WalletBalance.objects.filter(
+            address__in={address for address, _ in keys},
+            token_id__in={token_id for _, token_id in keys},
+        ).values_list("id", "address", "token_id")
+        return {
+            (address, token_id): pk
+            for pk, address, token_id in rows
+            if (address, token_id) in keys
+        }
+
+    @staticmethod
+    def rebuild(token_ids=None, batch_size=2000):
+        """根据 Transaction 表重新计算余额（覆盖已有数据）
+
+        Args:
+            token_ids: 只处理这些代币，None 表示全部
+
+        Returns:
+            int: 生成的余额行数
+        """
+        transactions = Transaction.objects.all()
+        balances = WalletBalance.objects.all()
+        if token_ids:
+            transactions = transactions.filter(token_id__in=token_ids)
+            balances = balances.filter(token_id__in=token_ids)
+
+        totals = defaultdict(lambda: {"inflow": 0, "outflow": 0, "tx_count": 0})
+        for field, column in (("to_address", "inflow"), ("from_address", "outflow")):
+            rows = (
+                transactions.values(field, "token_id")
+                .annotate(total=Sum("amount"), count=Count("id"))
+                .order_by()
+                .iterator(chunk_size=batch_size)
+            )
+            for row in rows:
+                item = totals[(row[field], row["token_id"])]
+                item[column] += row["total"] or 0
+                item["tx_count"] += row["count"]
+
+        # 自己转给自己的交易只计一次
+        self_transfers = (
+            transactions.filter(from_address=F("to_address"))
+            .values("from_address", "token_id")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for row in self_transfers.iterator(chunk_size=batch_size):
+            totals[(row["from_address"], row["token_id"])]["tx_count"] -= row["count"]
+
+        with transaction.atomic():
+            balances.delete()
+            WalletBalance.objects.bulk_create(
+                (
+                    WalletBalance(
+                        address=address,
+                        token_id=token_id,
+                        balance=item["inflow"] - item["outflow"],
+                        **item,
+                    )
+                    for (address, token_id), item in totals.items()
+                ),
+                batch_size=batch_size,
+            )
+        return len(totals)
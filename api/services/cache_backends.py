@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+"""缓存后端：进程内 LRU 缓存与 Django 共享缓存的统一接口"""
+
+
+class LocalCacheBackend:
+    """进程内缓存，带 TTL 过期与 LRU 容量上限（线程安全）"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def add(self, key, value, timeout=None):
+        """仅当键不存在（或已过期）时写入，返回是否写入成功"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and (item[1] is None or item[1] > time.monotonic()):
+                return False
+        self.set(key, value, timeout)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DjangoCacheBackend:
+    """基于 Django CACHES 配置的共享缓存（多 worker 共享，如 Redis/Memcached）"""
+
+    def __init__(self, alias="default", key_prefix=""):
+        self.cache = caches[alias]
+        self.key_prefix = key_prefix
+
+    def _key(self, key):
+        return f"{self.key_prefix}{key}"
+
+    def get(self, key, default=None):
+        return self.cache.get(self._key(key), default)
+
+    def set(self, key, value, timeout=None):
+        self.cache.set(self._key(key), value, timeout)
+
+    def add(self, key, value, timeout=None):
+        return self.cache.add(self._key(key), value, timeout)
+
+    def delete(self, key):
+        self.cache.delete(self._key(key))
+
+    def clear(self):
+        # 共享缓存不做整体清空，避免误删其他应用的数据
+        pass
+
+
+def build_cache_backend(options, key_prefix=""):
+    """根据配置构建缓存后端
+
+    Args:
+        options: 配置字典，BACKEND 为 "local" 或 "django"
+        key_prefix: 共享缓存的键前缀
+
+    Returns:
+        LocalCacheBackend | DjangoCacheBackend
+    """
+    if options.get("BACKEND", "local") == "django":
+        return DjangoCacheBackend(
+            alias=options.get("ALIAS", "default"), key_prefix=key_prefix
+        )
+    return LocalCacheBackend(max_entries=options.get("MAX_ENTRIES", 256))
@@ -0,0 +1,112 @@
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Favorite, Token
+
+from .cache_backends import build_cache_backend
+
+"""收藏服务：收藏/取消收藏、冗余收藏数的维护与按用户缓存的收藏代币集合"""
+
+
+def _cache_key(user_id):
+    return f"favorite:tokens:{user_id}"
+
+
+class FavoriteService:
+    """收藏的写入与查询
+
+    Token.favorited_count 由 Favorite 的 post_save/post_delete 接收器在写入
+    Favorite 的同一事务内用 F() 增减（admin 删除、级联删除同样生效）。
+
+    用户收藏的代币 ID 集合整体加载一次，保存在 user 对象上（相当于请求级
+    缓存），并写入 TTL 缓存供后续请求复用；收藏变化提交后按用户失效。
+    """
+
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+
+    def favorite_token_ids(self, user):
+        """用户收藏的代币 ID 集合（未登录用户为空集合）"""
+        if not user or not user.is_authenticated:
+            return frozenset()
+        memo = getattr(user, "_favorite_token_ids", None)
+        if memo is not None:
+            return memo
+
+        token_ids = self.backend.get(_cache_key(user.id))
+        if token_ids is None:
+            # 写入共享缓存的集合总是从主库读取（只读副本可能落后于刚提交的收藏）
+            token_ids = frozenset(
+                Favorite.objects.using(DEFAULT_DB_ALIAS)
+                .filter(user_id=user.id)
+                .values_list("token_id", flat=True)
+            )
+            self.backend.set(_cache_key(user.id), token_ids, self.ttl)
+        user._favorite_token_ids = token_ids
+        return token_ids
+
+    def add(self, user, token):
+        """收藏代币，返回是否新建了收藏"""
+        with transaction.atomic():
+            _, created = Favorite.objects.get_or_create(user_id=user.id, token=token)
+        self._forget(user)
+        return created
+
+    def remove(self, user, token):
+        """取消收藏，返回是否删除了收藏"""
+        with transaction.atomic():
+            deleted, _ = Favorite.objects.filter(user_id=user.id, token=token).delete()
+        self._forget(user)
+        return deleted > 0
+
+    def invalidate(self, user_id):
+        self.backend.delete(_cache_key(user_id))
+
+    @staticmethod
+    def _forget(user):
+        # 同一请求内后续的判断重新读取
+        user.__dict__.pop("_favorite_token_ids", None)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_favorite_service():
+    """获取进程级共享的收藏服务（按 settings.FAVORITE_CACHE 配置）"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                options = getattr(settings, "FAVORITE_CACHE", {})
+                _service = FavoriteService(
+                    backend=build_cache_backend(options, key_prefix="sol:"),
+                    ttl=options.get("TTL", 60),
+                )
+    return _service
+
+
+def _on_favorite_change(favorite, delta):
+    Token.objects.filter(pk=favorite.token_id).update(
+        favorited_count=F("favorited_count") + delta
+    )
+    # 提交后再失效，避免并发请求在提交前用旧数据重新填充缓存
+    user_id = favorite.user_id
+    transaction.on_commit(lambda: get_favorite_service().invalidate(user_id))
+
+
+@receiver(post_save, sender=Favorite)
+def count_favorite_added(sender, instance, created, **kwargs):
+    if created:
+        _on_favorite_change(instance, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def count_favorite_removed(sender, instance, **kwargs):
+    _on_favorite_change(instance, -1)
@@ -0,0 +1,252 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+"""HTTP 客户端：连接池复用、超时、带抖动的指数退避重试与熔断"""
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_CLIENT_OPTIONS = {
+    "POOL_CONNECTIONS": 4,  # 缓存的主机连接池数量
+    "POOL_MAXSIZE": 20,  # 每个主机保持的最大 keep-alive 连接数
+    "CONNECT_TIMEOUT": 3.05,
+    "READ_TIMEOUT": 10,
+    "MAX_RETRIES": 3,
+    "BACKOFF_BASE": 0.5,
+    "BACKOFF_MAX": 10,
+    "FAILURE_THRESHOLD": 5,  # 连续失败多少次后熔断
+    "RESET_TIMEOUT": 30,  # 熔断后多久允许一次试探请求
+}
+
+
+class CircuitOpenError(requests.RequestException):
+    """熔断器处于打开状态，请求被直接拒绝"""
+
+
+class CircuitBreaker:
+    """连续失败达到阈值后熔断，RESET_TIMEOUT 之后放行一次试探请求（half-open）"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class HttpClient:
+    """按上游服务共享的 HTTP 客户端
+
+    同一个 requests.Session 在进程内复用，每个主机维持 keep-alive 连接池，
+    避免每次请求重新进行 TCP+TLS 握手。
+    """
+
+    def __init__(self, name, options=None):
+        options = {**DEFAULT_CLIENT_OPTIONS, **(options or {})}
+        self.name = name
+        self.timeout = (options["CONNECT_TIMEOUT"], options["READ_TIMEOUT"])
+        self.max_retries = options["MAX_RETRIES"]
+        self.backoff_base = options["BACKOFF_BASE"]
+        self.backoff_max = options["BACKOFF_MAX"]
+        self.breaker = CircuitBreaker(
+            failure_threshold=options["FAILURE_THRESHOLD"],
+            reset_timeout=options["RESET_TIMEOUT"],
+        )
+
+        self.adapter = HTTPAdapter(
+            pool_connections=options["POOL_CONNECTIONS"],
+            pool_maxsize=options["POOL_MAXSIZE"],
+            max_retries=0,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self._counters = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "rate_limited": 0,
+            "short_circuited": 0,
+        }
+        self._counters_lock = threading.Lock()
+
+    def _incr(self, counter):
+        with self._counters_lock:
+            self._counters[counter] += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """发送请求，对连接错误、超时和 429/5xx 进行重试
+
+        Returns:
+            requests.Response: 最终响应（调用方自行 raise_for_status）
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+            requests.RequestException: 重试耗尽后的网络错误
+        """
+        if not self.breaker.allow():
+            self._incr("short_circuited")
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        kwargs.setdefault("timeout", self.timeout)
+        settled = False
+        try:
+            response = self._send(method, url, kwargs)
+            settled = True
+            return response
+        finally:
+            # 其他异常（ChunkedEncodingError、InvalidURL 等）同样计为失败，
+            # 保证 half-open 试探标记总会被清除
+            if not settled:
+                self._incr("failures")
+                self.breaker.record_failure()
+
+    def _send(self, method, url, kwargs):
+        attempt = 0
+        while True:
+            self._incr("requests")
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"{self.name} {method} {url} failed ({e}), retry in {delay:.2f}s"
+                )
+            else:
+                if response.status_code == 429:
+                    self._incr("rate_limited")
+                if response.status_code not in RETRY_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+
+                retry_after = self._retry_after(response)
+                if attempt >= self.max_retries or (
+                    retry_after is not None and retry_after > self.backoff_max
+                ):
+                    self._incr("failures")
+                    self.breaker.record_failure()
+                    return response
+                delay = (
+                    retry_after if retry_after is not None else self._backoff(attempt)
+                )
+                response.close()
+
+            self._incr("retries")
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt):
+        """带完全抖动（full jitter）的指数退避"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            # 无法解析的 Retry-After 按未提供处理，使用指数退避
+            return None
+        if parsed is None:
+            return None
+        return max(0.0, parsed.timestamp() - time.time())
+
+    def stats(self):
+        """连接池与重试统计
+
+        new_connections 为实际建立的连接数，requests - new_connections
+        即为通过 keep-alive 省下的握手次数。
+        """
+        pools = {}
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "new_connections": pool.num_connections,
+                "requests": pool.num_requests,
+            }
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "pools": pools,
+        }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(name):
+    """获取进程级共享的 HTTP 客户端（配置见 settings.HTTP_CLIENTS[name]）"""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                options = getattr(settings, "HTTP_CLIENTS", {}).get(name, {})
+                client = _clients[name] = HttpClient(name, options)
+    return client
+
+
+def get_http_client_stats():
+    """所有已创建客户端的统计信息"""
+    return {name: client.stats() for name, client in list(_clients.items())}
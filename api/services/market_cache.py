@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .cache_backends import LocalCacheBackend, build_cache_backend
+
+"""市场数据缓存：TTL + LRU、过期后台刷新（stale-while-revalidate）与请求合并"""
+
+logger = logging.getLogger(__name__)
+
+
+def top_tokens_key(vs_currency, page, per_page):
+    """热门代币列表的缓存键，按 (vs_currency, page, per_page) 区分"""
+    return f"market:top:{vs_currency.lower()}:{page}:{per_page}"
+
+
+class _Flight:
+    """一次正在进行的上游请求，供并发的等待者共享结果"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class MarketDataCache:
+    """市场数据缓存
+
+    - 新鲜期（TTL）内直接返回缓存
+    - 过期但在 STALE_TTL 内：先返回旧值，同时在后台线程刷新
+    - 未命中：同一个键的并发请求只触发一次上游请求
+    """
+
+    def __init__(self, backend, ttl=60, stale_ttl=300, lock_timeout=10):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "fetches": 0,
+            "errors": 0,
+        }
+
+    @property
+    def shared(self):
+        """是否为多 worker 共享的后端"""
+        return not isinstance(self.backend, LocalCacheBackend)
+
+    def get(self, key):
+        """读取缓存值（不区分新鲜/过期），未命中返回 None"""
+        entry = self.backend.get(key)
+        return entry["value"] if entry is not None else None
+
+    def set(self, key, value):
+        self.backend.set(
+            key,
+            {"value": value, "fetched_at": time.time()},
+            self.ttl + self.stale_ttl,
+        )
+
+    def invalidate(self, key):
+        self.backend.delete(key)
+
+    def get_or_fetch(self, key, fetch):
+        """读取缓存，必要时调用 fetch() 获取上游数据
+
+        Args:
+            key: 缓存键
+            fetch: 无参可调用对象，返回需要缓存的值；抛出异常时不写入缓存
+
+        Returns:
+            缓存值或 fetch() 的结果
+        """
+        entry = self.backend.get(key)
+        if entry is not None:
+            if time.time() - entry["fetched_at"] < self.ttl:
+                self.stats["hits"] += 1
+            else:
+                self.stats["stale_hits"] += 1
+                self._refresh_in_background(key, fetch)
+            return entry["value"]
+
+        self.stats["misses"] += 1
+        return self._fetch_coalesced(key, fetch)
+
+    def _fetch_coalesced(self, key, fetch):
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            self.stats["coalesced"] += 1
+            flight.done.wait(self.lock_timeout)
+            if flight.error is not None:
+                raise flight.error
+            if flight.done.is_set():
+                return flight.value
+            return fetch()
+
+        locked = False
+        try:
+            if self.shared:
+                locked = self._acquire_shared_lock(key)
+                if not locked:
+                    # 其他 worker 正在请求上游，等待其写入结果
+                    value = self._wait_for_shared(key)
+                    if value is not None:
+                        flight.value = value
+                        return value
+            flight.value = self._fetch_and_store(key, fetch)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            if locked:
+                self._release_shared_lock(key)
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._inflight:
+                return
+            flight = self._inflight[key] = _Flight()
+
+        def refresh():
+            locked = False
+            try:
+                if self.shared:
+                    locked = self._acquire_shared_lock(key)
+                    if not locked:
+                        return
+                flight.value = self._fetch_and_store(key, fetch)
+            except Exception as e:
+                flight.error = e
+                logger.warning(f"Background market refresh failed for {key}: {e}")
+            finally:
+                if locked:
+                    self._release_shared_lock(key)
+                with self._lock:
+                    self._inflight.pop(key, None)
+                flight.done.set()
+
+        threading.Thread(target=refresh, name=f"refresh:{key}", daemon=True).start()
+
+    def _fetch_and_store(self, key, fetch):
+        self.stats["fetches"] += 1
+        try:
+            value = fetch()
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        self.set(key, value)
+        return value
+
+    def _acquire_shared_lock(self, key):
+        return self.backend.add(f"{key}:lock", 1, self.lock_timeout)
+
+    def _release_shared_lock(self, key):
+        self.backend.delete(f"{key}:lock")
+
+    def _wait_for_shared(self, key, interval=0.05):
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            value = self.get(key)
+            if value is not None:
+                return value
+            time.sleep(interval)
+        return None
+
+
+_market_cache = None
+_market_cache_lock = threading.Lock()
+
+
+def get_market_cache():
+    """获取进程级共享的市场数据缓存实例（按 settings.MARKET_CACHE 配置）"""
+    global _market_cache
+    if _market_cache is None:
+        with _market_cache_lock:
+            if _market_cache is None:
+                options = getattr(settings, "MARKET_CACHE", {})
+                _market_cache = MarketDataCache(
+                    backend=build_cache_backend(options, key_prefix="sol:"),
+                    ttl=options.get("TTL", 60),
+                    stale_ttl=options.get("STALE_TTL", 300),
+                    lock_timeout=options.get("LOCK_TIMEOUT", 10),
+                )
+    return _market_cache
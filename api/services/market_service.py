@@ -1,20 +1,18 @@
-import requests
-try:
-    from solana.rpc.api import Client
-except ImportError:
-    from solana.rpc import Client  # 使用新版本的导入路径
-from django.conf import settings
+from .http_client import get_http_client
+from .market_cache import get_market_cache, top_tokens_key
+from .solana_rpc import get_rpc_gateway
 
 """市场服务：处理代币市场数据的获取和处理"""
 
 class MarketService:
     def __init__(self):
-        """初始化Solana客户端和CoinGecko API"""
-        self.solana_client = Client(settings.SOLANA_RPC_URL)
+        """初始化Solana RPC网关和CoinGecko API"""
+        self.rpc = get_rpc_gateway()
         self.coingecko_api = "https://api.coingecko.com/api/v3"
+        self.http = get_http_client("coingecko")
 
     def get_top_tokens(self, vs_currency='usd', page=1, per_page=20):
-        """获取热门代币列表
+        """获取热门代币列表（经由市场数据缓存）
         
         Args:
             vs_currency: 计价货币（默认USD）
@@ -25,40 +23,95 @@ class MarketService:
             dict: 包含分页信息和代币列表的字典
         """
         try:
-            url = f"{self.coingecko_api}/coins/markets"
-            params = {
-                "vs_currency": vs_currency,
-                "order": "market_cap_desc",
-                "per_page": per_page,
-                "page": page,
-                "sparkline": False,
-                "category": "solana-ecosystem"
-            }
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            return {
-                'page': page,
-                'per_page': per_page,
-                'tokens': [{
-                    'token_address': token.get('id', ''),
-                    'symbol': token.get('symbol', '').upper(),
-                    'name': token.get('name', ''),
-                    'price_usd': token.get('current_price', 0),
-                    'market_cap': token.get('market_cap', 0),
-                    'volume_24h': token.get('total_volume', 0),
-                    'price_change_24h': token.get('price_change_percentage_24h', 0) or 0,
-                    'last_updated': token.get('last_updated'),
-                    'image': token.get('image', ''),
-                    'ath': token.get('ath', 0),
-                    'atl': token.get('atl', 0)
-                } for token in response.json()]
-            }
-            
+            return get_market_cache().get_or_fetch(
+                top_tokens_key(vs_currency, page, per_page),
+                lambda: self.fetch_top_tokens(vs_currency, page, per_page),
+            )
         except Exception as e:
             print(f"Error fetching market data: {str(e)}")
             return {'page': page, 'per_page': per_page, 'tokens': []}
 
+    def fetch_top_tokens(self, vs_currency='usd', page=1, per_page=20):
+        """直接请求 CoinGecko 获取热门代币列表（不经过缓存）
+        
+        Raises:
+            requests.RequestException: 上游请求失败
+        """
+        url = f"{self.coingecko_api}/coins/markets"
+        params = self.market_list_params(vs_currency, page, per_page)
+        response = self.http.get(url, params=params)
+        response.raise_for_status()
+        
+        return {
+            'page': page,
+            'per_page': per_page,
+            'tokens': [self.normalize_market_token(token) for token in response.json()]
+        }
+
+    def fetch_market_chart(self, coin_id, vs_currency='usd', days=365):
+        """请求 CoinGecko 历史价格（/coins/{id}/market_chart）
+
+        Returns:
+            list: [(Unix 秒, 价格), ...]，按时间升序
+
+        Raises:
+            requests.RequestException: 上游请求失败
+        """
+        url = f"{self.coingecko_api}/coins/{coin_id}/market_chart"
+        response = self.http.get(url, params={'vs_currency': vs_currency, 'days': days})
+        response.raise_for_status()
+
+        return [
+            (int(timestamp_ms // 1000), float(price))
+            for timestamp_ms, price in response.json().get('prices', [])
+            if price is not None
+        ]
+
+    def market_list_params(self, vs_currency, page, per_page):
+        """CoinGecko /coins/markets 的查询参数"""
+        return {
+            "vs_currency": vs_currency,
+            "order": "market_cap_desc",
+            "per_page": per_page,
+            "page": page,
+            "sparkline": False,
+            "category": "solana-ecosystem"
+        }
+
+    @staticmethod
+    def normalize_market_token(token):
+        """把 /coins/markets 返回的单个代币转换为本服务的统一结构"""
+        return {
+            'token_address': token.get('id', ''),
+            'symbol': token.get('symbol', '').upper(),
+            'name': token.get('name', ''),
+            'price_usd': token.get('current_price', 0),
+            'market_cap': token.get('market_cap', 0),
+            'volume_24h': token.get('total_volume', 0),
+            'price_change_24h': token.get('price_change_percentage_24h', 0) or 0,
+            'last_updated': token.get('last_updated'),
+            'image': token.get('image', ''),
+            'ath': token.get('ath', 0),
+            'atl': token.get('atl', 0)
+        }
+
+    @staticmethod
+    def normalize_token_details(token_address, token_data, onchain_data):
+        """把 /coins/{id} 返回的数据与链上数据合并为代币详情结构"""
+        return {
+            'token_address': token_address,
+            'symbol': token_data.get('symbol', '').upper(),
+            'name': token_data.get('name', ''),
+            'price_usd': token_data.get('market_data', {}).get('current_price', {}).get('usd', 0),
+            'market_cap': token_data.get('market_data', {}).get('market_cap', {}).get('usd', 0),
+            'volume_24h': token_data.get('market_data', {}).get('total_volume', {}).get('usd', 0),
+            'price_change_24h': token_data.get('market_data', {}).get('price_change_percentage_24h', 0),
+            'description': token_data.get('description', {}).get('en', ''),
+            'homepage': token_data.get('links', {}).get('homepage', []),
+            'image': token_data.get('image', {}).get('large', ''),
+            'onchain_data': onchain_data
+        }
+
     def get_token_details(self, token_address):
         """获取单个代币的详细信息
         
@@ -72,26 +125,14 @@ class MarketService:
         try:
             # 获取 CoinGecko API 详细数据
             url = f"{self.coingecko_api}/coins/{token_address}"
-            response = requests.get(url)
+            response = self.http.get(url)
             response.raise_for_status()
             token_data = response.json()
             
             # 获取链上数据
             onchain_data = self.get_token_onchain_data(token_address)
             
-            return {
-                'token_address': token_address,
-                'symbol': token_data.get('symbol', '').upper(),
-                'name': token_data.get('name', ''),
-                'price_usd': token_data.get('market_data', {}).get('current_price', {}).get('usd', 0),
-                'market_cap': token_data.get('market_data', {}).get('market_cap', {}).get('usd', 0),
-                'volume_24h': token_data.get('market_data', {}).get('total_volume', {}).get('usd', 0),
-                'price_change_24h': token_data.get('market_data', {}).get('price_change_percentage_24h', 0),
-                'description': token_data.get('description', {}).get('en', ''),
-                'homepage': token_data.get('links', {}).get('homepage', []),
-                'image': token_data.get('image', {}).get('large', ''),
-                'onchain_data': onchain_data
-            }
+            return self.normalize_token_details(token_address, token_data, onchain_data)
             
         except Exception as e:
             print(f"Error fetching token details: {str(e)}")
@@ -99,12 +140,19 @@ class MarketService:
 
     def get_token_onchain_data(self, token_address):
         try:
-            response = self.solana_client.get_token_supply(token_address)
-            if response["result"]["value"]:
-                return {
-                    "total_supply": response["result"]["value"]["amount"],
-                    "decimals": response["result"]["value"]["decimals"]
-                }
+            return self.rpc.get_token_supply(token_address)
         except Exception as e:
             print(f"Error fetching onchain data: {str(e)}")
             return None
+
+    def get_tokens_onchain_data(self, token_addresses):
+        """批量获取多个代币的链上供应量（getMultipleAccounts，每 100 个一次调用）
+        
+        Returns:
+            dict: {token_address: onchain_data | None}
+        """
+        try:
+            return self.rpc.get_token_supplies(token_addresses)
+        except Exception as e:
+            print(f"Error fetching onchain data: {str(e)}")
+            return dict.fromkeys(token_addresses)
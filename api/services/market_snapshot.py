@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import MarketSnapshot, MarketToken
+
+from .market_service import MarketService
+
+"""市场快照服务：后台拉取完整的 Solana 生态代币列表并在本地提供分页读取"""
+
+logger = logging.getLogger(__name__)
+
+
+class MarketIngestionService:
+    """分页拉取 CoinGecko solana-ecosystem 列表并增量写入 MarketToken"""
+
+    def __init__(self, market_service=None, page_delay=0):
+        self.market_service = market_service or MarketService()
+        self.page_delay = page_delay
+
+    def refresh(self, vs_currency="usd", per_page=250, max_pages=None):
+        """执行一次完整刷新
+
+        先把所有分页拉取到内存，全部成功后才在单个事务中写库；
+        任何一页失败都会把本次快照标记为 failed，已有数据保持不变。
+
+        Args:
+            vs_currency: 计价货币
+            per_page: 每页数量（CoinGecko 上限 250）
+            max_pages: 最多拉取的页数，None 表示直到最后一页
+
+        Returns:
+            MarketSnapshot: 本次刷新的快照记录
+        """
+        vs_currency = vs_currency.lower()
+        snapshot = MarketSnapshot.objects.create(vs_currency=vs_currency)
+        try:
+            tokens = self._fetch_all(vs_currency, per_page, max_pages)
+            upserted, removed = self._store(snapshot, tokens)
+        except Exception as e:
+            logger.error(f"Market ingestion failed for {vs_currency}: {e}")
+            snapshot.status = "failed"
+            snapshot.error = str(e)
+            snapshot.finished_at = timezone.now()
+            snapshot.save(update_fields=["status", "error", "finished_at"])
+            return snapshot
+
+        snapshot.status = "success"
+        snapshot.token_count = len(tokens)
+        snapshot.upserted_count = upserted
+        snapshot.removed_count = removed
+        snapshot.finished_at = timezone.now()
+        snapshot.save()
+        return snapshot
+
+    def _fetch_all(self, vs_currency, per_page, max_pages):
+        tokens = []
+        seen = set()
+        page = 1
+        while max_pages is None or page <= max_pages:
+            result = self.market_service.fetch_top_tokens(
+                vs_currency=vs_currency, page=page, per_page=per_page
+            )
+            batch = result["tokens"]
+            for token in batch:
+                # 分页过程中排名可能变化，同一代币只保留第一次出现的位置
+                if token["token_address"] and token["token_address"] not in seen:
+                    seen.add(token["token_address"])
+                    tokens.append(token)
+            if len(batch) < per_page:
+                break
+            page += 1
+            if self.page_delay:
+                time.sleep(self.page_delay)
+        return tokens
+
+    def _store(self, snapshot, tokens):
+        vs_currency = snapshot.vs_currency
+        existing = {
+            address: (rank, data)
+            for address, rank, data in MarketToken.objects.filter(
+                vs_currency=vs_currency
+            ).values_list("token_address", "rank", "data")
+        }
+
+        changed = []
+        for rank, token in enumerate(tokens, start=1):
+            address = token["token_address"]
+            if existing.get(address) == (rank, token):
+                continue
+            changed.append(
+                MarketToken(
+                    vs_currency=vs_currency,
+                    token_address=address,
+                    rank=rank,
+                    symbol=token["symbol"][:50],
+                    data=token,
+                    snapshot=snapshot,
+                )
+            )
+        removed = set(existing) - {token["token_address"] for token in tokens}
+
+        with transaction.atomic():
+            MarketToken.objects.bulk_create(
+                changed,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["vs_currency", "token_address"],
+                update_fields=["rank", "symbol", "data", "snapshot", "updated_at"],
+            )
+            if removed:
+                MarketToken.objects.filter(
+                    vs_currency=vs_currency, token_address__in=removed
+                ).delete()
+        return len(changed), len(removed)
+
+
+class MarketSnapshotStore:
+    """进程内的快照读取层
+
+    每个计价货币的完整代币列表常驻内存，最多每 CHECK_INTERVAL 秒查询一次
+    最新成功快照的 id，只有快照变化时才重新加载，请求路径上没有外部调用。
+    """
+
+    def __init__(self, check_interval=5):
+        self.check_interval = check_interval
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def get_tokens(self, vs_currency):
+        """返回最新快照中的完整代币列表（按排名），无快照时返回 None"""
+        vs_currency = vs_currency.lower()
+        now = time.monotonic()
+        cached = self._snapshots.get(vs_currency)
+        if cached is not None and now - cached["checked_at"] < self.check_interval:
+            return cached["tokens"]
+
+        with self._lock:
+            cached = self._snapshots.get(vs_currency)
+            if cached is not None and now - cached["checked_at"] < self.check_interval:
+                return cached["tokens"]
+
+            latest = (
+                MarketSnapshot.objects.filter(vs_currency=vs_currency, status="success")
+                .order_by("-id")
+                .values_list("id", "finished_at")
+                .first()
+            )
+            snapshot_id, finished_at = latest or (None, None)
+            if cached is None or cached["snapshot_id"] != snapshot_id:
+                tokens = None
+                if snapshot_id is not None:
+                    tokens = list(
+                        MarketToken.objects.filter(vs_currency=vs_currency)
+                        .order_by("rank")
+                        .values_list("data", flat=True)
+                    )
+                cached = {
+                    "snapshot_id": snapshot_id,
+                    "finished_at": finished_at,
+                    "tokens": tokens,
+                }
+            cached["checked_at"] = now
+            self._snapshots[vs_currency] = cached
+            return cached["tokens"]
+
+    def snapshot_info(self, vs_currency):
+        """最新成功快照的 (id, finished_at)，无快照时返回 (None, None)"""
+        self.get_tokens(vs_currency)
+        cached = self._snapshots[vs_currency.lower()]
+        return cached["snapshot_id"], cached["finished_at"]
+
+    def get_window(self, vs_currency, limit, offset):
+        """按 limit/offset 返回与 get_top_tokens 相同结构的结果
+
+        Returns:
+            dict: 分页结果；本地尚无快照时返回 None
+        """
+        tokens = self.get_tokens(vs_currency)
+        if tokens is None:
+            return None
+        return {
+            "page": (offset // limit) + 1 if limit > 0 else 1,
+            "per_page": limit,
+            "tokens": tokens[offset : offset + limit] if limit > 0 else [],
+        }
+
+
+_snapshot_store = None
+
+
+def get_snapshot_store():
+    """获取进程级共享的快照读取层"""
+    global _snapshot_store
+    if _snapshot_store is None:
+        options = getattr(settings, "MARKET_SNAPSHOT", {})
+        _snapshot_store = MarketSnapshotStore(
+            check_interval=options.get("CHECK_INTERVAL", 5)
+        )
+    return _snapshot_store
@@ -0,0 +1,344 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import IndexerCheckpoint, Token, Transaction, User
+
+from .solana_rpc import RpcError, get_rpc_gateway
+from .transfer_service import TransferService, parse_amount
+
+"""链上索引服务：按地址拉取 Solana 交易签名，解析 SPL 代币转账并批量写入 Transaction"""
+
+logger = logging.getLogger(__name__)
+
+# jsonParsed 编码中 SPL Token 与 Token-2022 程序的名称
+TOKEN_PROGRAMS = {"spl-token", "spl-token-2022"}
+TRANSFER_TYPES = {"transfer", "transferChecked"}
+
+
+def _account_keys(message):
+    # jsonParsed 的 accountKeys 为对象列表，其他编码为字符串列表
+    return [
+        key["pubkey"] if isinstance(key, dict) else key
+        for key in message.get("accountKeys", [])
+    ]
+
+
+def _token_accounts(tx):
+    """代币账户 -> (所有者, Mint)，来自交易前后的代币余额"""
+    keys = _account_keys(tx["transaction"]["message"])
+    meta = tx.get("meta") or {}
+    accounts = {}
+    for balance in (meta.get("preTokenBalances") or []) + (
+        meta.get("postTokenBalances") or []
+    ):
+        index = balance.get("accountIndex")
+        if index is not None and index < len(keys):
+            accounts[keys[index]] = (balance.get("owner"), balance.get("mint"))
+    return accounts
+
+
+def _instructions(tx):
+    """按执行顺序展开外层指令与其内部指令（CPI）"""
+    meta = tx.get("meta") or {}
+    inner = {
+        group["index"]: group.get("instructions", [])
+        for group in meta.get("innerInstructions") or []
+    }
+    for index, instruction in enumerate(tx["transaction"]["message"]["instructions"]):
+        yield instruction
+        yield from inner.get(index, [])
+
+
+def parse_transfers(signature, tx):
+    """解析一笔 jsonParsed 交易中的 SPL 代币转账
+
+    收发地址为代币账户的所有者（钱包地址），与本地转账的地址含义一致；
+    执行失败的交易没有转账。
+
+    Args:
+        signature: 交易签名
+        tx: getTransaction 的返回结果
+
+    Returns:
+        list: [{'signature', 'instruction_index', 'mint', 'from_address',
+               'to_address', 'amount', 'block_time'}, ...]
+    """
+    if not tx or (tx.get("meta") or {}).get("err") is not None:
+        return []
+    accounts = _token_accounts(tx)
+    transfers = []
+    for position, instruction in enumerate(_instructions(tx)):
+        parsed = instruction.get("parsed")
+        if (
+            instruction.get("program") not in TOKEN_PROGRAMS
+            or not isinstance(parsed, dict)
+            or parsed.get("type") not in TRANSFER_TYPES
+        ):
+            continue
+        info = parsed.get("info", {})
+        source_owner, source_mint = accounts.get(info.get("source"), (None, None))
+        dest_owner, dest_mint = accounts.get(info.get("destination"), (None, None))
+        amount = parse_amount(
+            info.get("amount") or info.get("tokenAmount", {}).get("amount")
+        )
+        mint = info.get("mint") or source_mint or dest_mint
+        if amount is None or not mint:
+            continue
+        transfers.append(
+            {
+                "signature": signature,
+                "instruction_index": position,
+                "mint": mint,
+                "from_address": source_owner
+                or info.get("authority")
+                or info.get("multisigAuthority")
+                or info["source"],
+                "to_address": dest_owner or info["destination"],
+                "amount": amount,
+                "block_time": tx.get("blockTime"),
+            }
+        )
+    return transfers
+
+
+class OnchainIndexer:
+    """按地址增量索引链上转账
+
+    每个地址的检查点记录最后处理的签名与 slot；中断后重新运行会从检查点
+    继续。同一时间只应运行一个索引进程。
+    """
+
+    def __init__(
+        self,
+        rpc_url=None,
+        batch_size=None,
+        concurrency=None,
+        gateway=None,
+    ):
+        options = getattr(settings, "ONCHAIN_INDEXER", {})
+        self.gateway = gateway or get_rpc_gateway(
+            rpc_url or options.get("RPC_URL") or settings.SOLANA_RPC_URL
+        )
+        self.commitment = options.get("COMMITMENT", "finalized")
+        self.batch_size = batch_size or options.get("BATCH_SIZE", 100)
+        self.concurrency = concurrency or options.get("CONCURRENCY", 4)
+        self.page_size = options.get("PAGE_SIZE", 1000)
+        self.max_backfill = options.get("MAX_BACKFILL", 10000)
+        self.stats = {
+            "signatures": 0,
+            "transactions": 0,
+            "transfers": 0,
+            "inserted": 0,
+            "errors": 0,
+            "elapsed": 0.0,
+        }
+
+    @property
+    def tx_per_second(self):
+        elapsed = self.stats["elapsed"]
+        return self.stats["transactions"] / elapsed if elapsed else 0.0
+
+    @staticmethod
+    def tracked_mints():
+        """{mint_address: token_id}，只包含设置了 Mint 地址的活跃代币"""
+        return dict(
+            Token.objects.filter(is_active=True, mint_address__isnull=False)
+            .exclude(mint_address="")
+            .values_list("mint_address", "id")
+        )
+
+    def run(self, addresses=None):
+        """索引被跟踪的 Mint 地址以及额外指定的地址（例如钱包或代币账户）
+
+        Returns:
+            dict: {address: 写入的转账数 | 错误信息}
+        """
+        mints = self.tracked_mints()
+        results = {}
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="onchain-indexer"
+        ) as executor:
+            for address in dict.fromkeys([*mints, *(addresses or [])]):
+                try:
+                    results[address] = self.index_address(address, mints, executor)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.exception("Failed to index %s", address)
+                    results[address] = str(e)
+        return results
+
+    def _new_signatures(self, address, checkpoint):
+        """检查点之后的新签名，按时间从旧到新排列
+
+        没有检查点时最多回溯 max_backfill 个签名。
+        """
+        signatures, before = [], None
+        while True:
+            config = {"limit": self.page_size, "commitment": self.commitment}
+            if before:
+                config["before"] = before
+            if checkpoint.last_signature:
+                config["until"] = checkpoint.last_signature
+            page = self.gateway.call("getSignaturesForAddress", [address, config])
+            if checkpoint.last_slot is not None:
+                # 检查点签名不在节点历史中时按 slot 截止，避免回溯全部历史
+                page = [item for item in page if item["slot"] >= checkpoint.last_slot]
+            signatures.extend(page)
+            backfilled = (
+                not checkpoint.last_signature and len(signatures) >= self.max_backfill
+            )
+            if len(page) < self.page_size or backfilled:
+                break
+            before = page[-1]["signature"]
+        if not checkpoint.last_signature:
+            signatures = signatures[: self.max_backfill]
+        signatures.reverse()
+        return signatures
+
+    def _fetch(self, signatures, executor):
+        """并发获取交易，每 batch_size 个签名一个批量请求
+
+        Returns:
+            list: 与 signatures 顺序一致的交易结果（获取失败为 RpcError）
+        """
+        config = {
+            "encoding": "jsonParsed",
+            "commitment": self.commitment,
+            "maxSupportedTransactionVersion": 0,
+        }
+        chunks = [
+            [
+                ("getTransaction", [item["signature"], config])
+                for item in signatures[start : start + self.batch_size]
+            ]
+            for start in range(0, len(signatures), self.batch_size)
+        ]
+        results = []
+        for chunk in executor.map(
+            lambda calls: self.gateway.batch(calls, return_exceptions=True), chunks
+        ):
+            results.extend(chunk)
+        return results
+
+    def index_address(self, address, mints, executor):
+        """索引一个地址的新交易
+
+        每处理 batch_size × concurrency 个签名提交一次（转账与检查点在同一个
+        事务中）。某笔交易获取失败时只提交它之前的部分，下次从失败处重试。
+
+        Returns:
+            int: 新写入的转账数
+        """
+        started = time.monotonic()
+        try:
+            return self._index(address, mints, executor)
+        finally:
+            self.stats["elapsed"] += time.monotonic() - started
+
+    def _index(self, address, mints, executor):
+        checkpoint, _ = IndexerCheckpoint.objects.get_or_create(address=address)
+        signatures = self._new_signatures(address, checkpoint)
+        self.stats["signatures"] += len(signatures)
+
+        inserted = 0
+        window = self.batch_size * self.concurrency
+        for start in range(0, len(signatures), window):
+            items = signatures[start : start + window]
+            # 执行失败的交易不需要获取，但检查点照常前移
+            pending = [item for item in items if item.get("err") is None]
+            fetched = dict(
+                zip(
+                    (item["signature"] for item in pending),
+                    self._fetch(pending, executor),
+                )
+            )
+
+            transfers, processed = [], []
+            for item in items:
+                tx = fetched.get(item["signature"])
+                if isinstance(tx, RpcError) or (item.get("err") is None and tx is None):
+                    # 节点暂时没有该交易（或返回错误）
+                    self.stats["errors"] += 1
+                    logger.warning(
+                        "Failed to fetch %s: %s", item["signature"], tx or "not found"
+                    )
+                    break
+                if tx is not None:
+                    self.stats["transactions"] += 1
+                    transfers.extend(parse_transfers(item["signature"], tx))
+                processed.append(item)
+
+            if processed:
+                inserted += self._write(transfers, mints, checkpoint, processed[-1])
+            if len(processed) < len(items):
+                break
+        return inserted
+
+    def _write(self, transfers, mints, checkpoint, last):
+        """写入被跟踪代币的转账并前移检查点
+
+        Returns:
+            int: 新写入的转账数
+        """
+        transfers = [item for item in transfers if item["mint"] in mints]
+        self.stats["transfers"] += len(transfers)
+        addresses = {item["from_address"] for item in transfers} | {
+            item["to_address"] for item in transfers
+        }
+        users = dict(
+            User.objects.filter(solana_address__in=addresses).values_list(
+                "solana_address", "id"
+            )
+        )
+
+        with transaction.atomic():
+            # 同一笔转账只属于一个代币：先按主键顺序锁住涉及的代币行，
+            # 并发的索引任务（其他地址/mint 的重叠扫描）写同一代币时在此排队，
+            # 之后读到的 existing 是准确的，派生数据只累加真正新写入的行
+            list(
+                Token.objects.select_for_update()
+                .filter(pk__in={mints[item["mint"]] for item in transfers})
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            existing = set(
+                Transaction.objects.filter(
+                    signature__in={item["signature"] for item in transfers}
+                ).values_list("signature", "instruction_index")
+            )
+            now = timezone.now()
+            rows = [
+                Transaction(
+                    token_id=mints[item["mint"]],
+                    from_address=item["from_address"],
+                    from_user_id=users.get(item["from_address"]),
+                    to_address=item["to_address"],
+                    to_user_id=users.get(item["to_address"]),
+                    amount=item["amount"],
+                    timestamp=(
+                        datetime.fromtimestamp(item["block_time"], dt_timezone.utc)
+                        if item["block_time"] is not None
+                        else now
+                    ),
+                    signature=item["signature"],
+                    instruction_index=item["instruction_index"],
+                )
+                for item in transfers
+                if (item["signature"], item["instruction_index"]) not in existing
+            ]
+            Transaction.objects.bulk_create(rows, ignore_conflicts=True)
+            TransferService.record_created(rows)
+
+            checkpoint.last_signature = last["signature"]
+            checkpoint.last_slot = last["slot"]
+            checkpoint.save(update_fields=["last_signature", "last_slot", "updated_at"])
+
+        self.stats["inserted"] += len(rows)
+        return len(rows)
@@ -0,0 +1,243 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+
+from core.models import Transaction
+
+from .price_service import CurrentPriceProvider
+
+"""钱包收益分析管道：按列读取交易，用 NumPy 向量化计算盈亏、时间加权收益、波动率与回撤"""
+
+SECONDS_PER_DAY = 86400
+TRADING_DAYS_PER_YEAR = 365
+# 单次 IN 查询包含的地址数量（批量模式）
+ADDRESS_BATCH_SIZE = 500
+
+
+def _empty_metrics():
+    return {
+        "tx_count": 0,
+        "first_activity": None,
+        "last_activity": None,
+        "current_value": 0.0,
+        "realized_pnl": 0.0,
+        "unrealized_pnl": 0.0,
+        "total_pnl": 0.0,
+        "time_weighted_return": 0.0,
+        "volatility": 0.0,
+        "max_drawdown": 0.0,
+        "days": 0,
+    }
+
+
+def _group_cumsum(values, starts):
+    """按分组计算累计和（values 已按分组排序，starts 为每个元素所在分组的起始下标）"""
+    totals = np.cumsum(values)
+    offsets = np.concatenate(([0.0], totals))[starts]
+    return totals - offsets
+
+
+def compute_metrics(token_ids, timestamps, quantities, price_provider, now=None):
+    """计算单个钱包的收益指标
+
+    Args:
+        token_ids: 代币 ID 数组（int64）
+        timestamps: Unix 秒数组（int64），按时间升序
+        quantities: 持仓变化数组（转入为正、转出为负）
+        price_provider: 提供 prices_at / current 的价格来源
+        now: 计算当前估值的时间（Unix 秒），默认当前时间
+
+    Returns:
+        dict: 指标字典；成本按累计平均买入价计算，日收益按每日收盘估值计算
+    """
+    n = len(quantities)
+    if n == 0:
+        return _empty_metrics()
+    now = int(now if now is not None else datetime.now(dt_timezone.utc).timestamp())
+    quantities = quantities.astype(np.float64)
+
+    tokens, token_index = np.unique(token_ids, return_inverse=True)
+    tx_prices = price_provider.prices_at(token_ids, timestamps)
+    current = price_provider.current(tokens)
+
+    # 已实现/未实现盈亏：按代币分组，累计平均成本 = 累计买入金额 / 累计买入数量
+    order = np.argsort(token_index, kind="stable")
+    grouped_token = token_index[order]
+    group_start = np.searchsorted(grouped_token, grouped_token, side="left")
+    qty = quantities[order]
+    price = tx_prices[order]
+    bought = np.where(qty > 0, qty, 0.0)
+    cum_qty = _group_cumsum(bought, group_start)
+    cum_cost = _group_cumsum(bought * price, group_start)
+    avg_cost = np.divide(cum_cost, cum_qty, out=price.copy(), where=cum_qty > 0)
+    sold = np.where(qty < 0, -qty, 0.0)
+    realized = float(np.sum(sold * (price - avg_cost)))
+
+    k = len(tokens)
+    positions = np.bincount(token_index, weights=quantities, minlength=k)
+    buy_qty = np.bincount(
+        token_index, weights=np.where(quantities > 0, quantities, 0.0), minlength=k
+    )
+    buy_cost = np.bincount(
+        token_index,
+        weights=np.where(quantities > 0, quantities * tx_prices, 0.0),
+        minlength=k,
+    )
+    final_cost = np.divide(buy_cost, buy_qty, out=current.copy(), where=buy_qty > 0)
+    held = np.clip(positions, 0, None)
+    unrealized = float(np.sum(held * (current - final_cost)))
+    current_value = float(np.sum(held * current))
+
+    # 每日估值：D×k 的持仓矩阵乘以每日收盘价矩阵
+    day = timestamps // SECONDS_PER_DAY
+    first_day = int(day[0])
+    days = np.arange(first_day, max(int(day[-1]), now // SECONDS_PER_DAY) + 1)
+    day_index = day - first_day
+    daily_delta = np.zeros((len(days), k))
+    np.add.at(daily_delta, (day_index, token_index), quantities)
+    daily_positions = np.cumsum(daily_delta, axis=0)
+
+    close = (days + 1) * SECONDS_PER_DAY - 1
+    grid_tokens = np.broadcast_to(tokens, (len(days), k))
+    grid_times = np.broadcast_to(np.minimum(close, now)[:, None], (len(days), k))
+    grid_prices = price_provider.prices_at(
+        grid_tokens.ravel(), grid_times.ravel()
+    ).reshape(len(days), k)
+    values = np.sum(np.clip(daily_positions, 0, None) * grid_prices, axis=1)
+    flows = np.bincount(day_index, weights=quantities * tx_prices, minlength=len(days))
+
+    # 时间加权收益：剔除当日资金流入/流出后的日收益连乘
+    previous = values[:-1]
+    returns = np.divide(
+        values[1:] - flows[1:] - previous,
+        previous,
+        out=np.zeros(len(days) - 1),
+        where=previous > 0,
+    )
+    growth = np.cumprod(1 + returns)
+    drawdown = (
+        growth / np.maximum.accumulate(growth) - 1 if len(growth) else np.zeros(1)
+    )
+    volatility = (
+        float(np.std(returns, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR))
+        if len(returns) > 1
+        else 0.0
+    )
+
+    return {
+        "tx_count": int(n),
+        "first_activity": datetime.fromtimestamp(int(timestamps[0]), dt_timezone.utc),
+        "last_activity": datetime.fromtimestamp(int(timestamps[-1]), dt_timezone.utc),
+        "current_value": current_value,
+        "realized_pnl": realized,
+        "unrealized_pnl": unrealized,
+        "total_pnl": realized + unrealized,
+        "time_weighted_return": float(growth[-1] - 1) if len(growth) else 0.0,
+        "volatility": volatility,
+        "max_drawdown": float(drawdown.min()),
+        "days": int(len(days)),
+    }
+
+
+class PerformancePipeline:
+    def __init__(self, price_provider=None, chunk_size=None):
+        options = getattr(settings, "WALLET_ANALYTICS", {})
+        self.price_provider = price_provider or CurrentPriceProvider()
+        self.chunk_size = chunk_size or options.get("CHUNK_SIZE", 5000)
+
+    def load(self, addresses):
+        """按列读取这些地址的全部交易（分块迭代，不创建模型实例）
+
+        每笔交易对集合内的收款方记一行正数量、对付款方记一行负数量。
+
+        Returns:
+            tuple: (address_codes, token_ids, timestamps, quantities)，按时间升序
+        """
+        codes = {address: code for code, address in enumerate(addresses)}
+        rows = (
+            Transaction.objects.filter(
+                Q(from_address__in=addresses) | Q(to_address__in=addresses)
+            )
+            .order_by("timestamp", "id")
+            .values_list(
+                "token_id", "timestamp", "amount", "from_address", "to_address"
+            )
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+        parts, offset = [], 0
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            size = len(chunk)
+            token_ids, stamps, amounts, senders, receivers = zip(*chunk)
+            token_ids = np.array(token_ids, dtype=np.int64)
+            amounts = np.array(amounts, dtype=np.int64)
+            seconds = np.fromiter(
+                (stamp.timestamp() for stamp in stamps), dtype=np.float64, count=size
+            ).astype(np.int64)
+            sender_codes = np.fromiter(
+                (codes.get(a, -1) for a in senders), dtype=np.int64, count=size
+            )
+            receiver_codes = np.fromiter(
+                (codes.get(a, -1) for a in receivers), dtype=np.int64, count=size
+            )
+            sequence = np.arange(offset, offset + size)
+            offset += size
+
+            # 自己转给自己的交易不改变持仓
+            for side, sign in ((receiver_codes, 1), (sender_codes, -1)):
+                mask = (side >= 0) & (sender_codes != receiver_codes)
+                parts.append(
+                    (
+                        sequence[mask],
+                        side[mask],
+                        token_ids[mask],
+                        seconds[mask],
+                        sign * amounts[mask],
+                    )
+                )
+
+        if not parts:
+            return tuple(np.zeros(0, dtype=np.int64) for _ in range(4))
+        sequence, *columns = (np.concatenate(column) for column in zip(*parts))
+        order = np.argsort(sequence, kind="stable")
+        return tuple(column[order] for column in columns)
+
+    def score(self, address, now=None):
+        """计算单个钱包的收益指标"""
+        return self.score_many([address], now=now)[address]
+
+    def score_many(self, addresses, now=None):
+        """批量模式：一次读取多个钱包的交易并逐个计算指标
+
+        Returns:
+            dict: {address: metrics}
+        """
+        addresses = list(dict.fromkeys(addresses))
+        results = {}
+        for start in range(0, len(addresses), ADDRESS_BATCH_SIZE):
+            batch = addresses[start : start + ADDRESS_BATCH_SIZE]
+            codes, token_ids, timestamps, quantities = self.load(batch)
+            if hasattr(self.price_provider, "prefetch"):
+                self.price_provider.prefetch(np.unique(token_ids))
+
+            # 稳定排序保持每个钱包内的时间顺序
+            order = np.argsort(codes, kind="stable")
+            codes = codes[order]
+            bounds = np.searchsorted(codes, np.arange(len(batch) + 1))
+            for code, address in enumerate(batch):
+                part = order[bounds[code] : bounds[code + 1]]
+                results[address] = compute_metrics(
+                    token_ids[part],
+                    timestamps[part],
+                    quantities[part],
+                    self.price_provider,
+                    now=now,
+                )
+        return results
@@ -0,0 +1,118 @@
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Permission, Token
+
+from .cache_backends import build_cache_backend
+
+"""权限服务：代币管理权限的统一判断，带请求级与短 TTL 缓存"""
+
+MANAGER_ROLES = ("token_issuer", "admin")
+
+
+def _cache_key(user_id):
+    return f"perm:manage:{user_id}"
+
+
+class PermissionResolver:
+    """判断用户能否管理代币（增发/销毁）
+
+    规则：用户持有 can_manage=True 的 Permission 记录，或者用户是代币所有者
+    且角色为 token_issuer/admin。
+
+    用户的 Permission 记录整体加载一次，保存在 user 对象上（request.user
+    每个请求重新加载，因此相当于请求级缓存），并写入短 TTL 缓存供后续请求
+    复用；Permission 保存/删除时按用户失效。
+    """
+
+    def __init__(self, backend, ttl=30):
+        self.backend = backend
+        self.ttl = ttl
+
+    def managed_token_ids(self, user):
+        """用户通过 Permission 记录可管理的代币 ID 集合"""
+        memo = getattr(user, "_managed_token_ids", None)
+        if memo is not None:
+            return memo
+
+        token_ids = self.backend.get(_cache_key(user.id))
+        if token_ids is None:
+            # 写入共享缓存的集合总是从主库读取（只读副本可能落后于刚提交的授权）
+            token_ids = frozenset(
+                Permission.objects.using(DEFAULT_DB_ALIAS)
+                .filter(user_id=user.id, can_manage=True)
+                .values_list("token_id", flat=True)
+            )
+            self.backend.set(_cache_key(user.id), token_ids, self.ttl)
+        user._managed_token_ids = token_ids
+        return token_ids
+
+    def can_manage_token(self, user, token):
+        """判断用户能否管理单个代币（只用 token.owner_id，不会加载 owner）"""
+        return self.manage_checker(user)(token.pk, token.owner_id)
+
+    def manage_checker(self, user):
+        """返回判断函数 check(token_id, owner_id) -> bool，适合逐行判断 values() 查询的结果"""
+        if not user or not user.is_authenticated:
+            return lambda token_id, owner_id: False
+        owner_id_allowed = user.id if user.role in MANAGER_ROLES else None
+        # Permission 记录在第一次需要时才加载（之后由 user 对象上的缓存提供）
+        return lambda token_id, owner_id: (
+            owner_id == owner_id_allowed or token_id in self.managed_token_ids(user)
+        )
+
+    def can_manage(self, user, token_ids):
+        """批量判断用户能否管理多个代币
+
+        Args:
+            user (User): 用户
+            token_ids: 代币 ID 列表
+
+        Returns:
+            dict: {token_id: bool}
+        """
+        token_ids = list(token_ids)
+        if not user or not user.is_authenticated:
+            return {token_id: False for token_id in token_ids}
+
+        managed = self.managed_token_ids(user)
+        result = {token_id: token_id in managed for token_id in token_ids}
+        remaining = [token_id for token_id, allowed in result.items() if not allowed]
+        if remaining and user.role in MANAGER_ROLES:
+            owned = Token.objects.filter(
+                pk__in=remaining, owner_id=user.id
+            ).values_list("pk", flat=True)
+            for token_id in owned:
+                result[token_id] = True
+        return result
+
+    def invalidate(self, user_id):
+        self.backend.delete(_cache_key(user_id))
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_permission_resolver():
+    """获取进程级共享的权限解析器（按 settings.PERMISSION_CACHE 配置）"""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                options = getattr(settings, "PERMISSION_CACHE", {})
+                _resolver = PermissionResolver(
+                    backend=build_cache_backend(options, key_prefix="sol:"),
+                    ttl=options.get("TTL", 30),
+                )
+    return _resolver
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_permission_cache(sender, instance, **kwargs):
+    get_permission_resolver().invalidate(instance.user_id)
@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+from core.models import PricePoint
+
+from .market_service import MarketService
+
+"""历史价格服务：从 CoinGecko market_chart 导入价格，并以 NumPy 数组提供 as-of 查询"""
+
+logger = logging.getLogger(__name__)
+
+
+class PriceHistoryIngestionService:
+    def __init__(self, market_service=None, batch_size=2000):
+        self.market_service = market_service or MarketService()
+        self.batch_size = batch_size
+
+    def ingest(self, coin_id, vs_currency="usd", days=365):
+        """拉取并写入一个币种的历史价格（已存在的时间点覆盖价格）
+
+        Returns:
+            int: 写入的价格点数量
+
+        Raises:
+            requests.RequestException: 上游请求失败
+        """
+        vs_currency = vs_currency.lower()
+        points = self.market_service.fetch_market_chart(coin_id, vs_currency, days)
+        # 同一秒内的重复点只保留最后一个
+        points = dict(points)
+        PricePoint.objects.bulk_create(
+            [
+                PricePoint(
+                    coin_id=coin_id,
+                    vs_currency=vs_currency,
+                    timestamp=timestamp,
+                    price=price,
+                )
+                for timestamp, price in points.items()
+            ],
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=["coin_id", "vs_currency", "timestamp"],
+            update_fields=["price"],
+        )
+        get_price_store().invalidate(coin_id, vs_currency)
+        return len(points)
+
+
+class PriceSeries:
+    """单个币种的价格序列：升序 int64 时间戳与 float64 价格两个数组"""
+
+    __slots__ = ("timestamps", "prices")
+
+    def __init__(self, timestamps, prices):
+        self.timestamps = timestamps
+        self.prices = prices
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def prices_at(self, timestamps):
+        """批量 as-of 查询：每个时间点取不晚于它的最近价格（二分查找）
+
+        早于第一个价格点的时间取第一个价格。
+        """
+        index = np.searchsorted(self.timestamps, timestamps, side="right") - 1
+        return self.prices[np.clip(index, 0, len(self.prices) - 1)]
+
+    def price_at(self, timestamp):
+        return float(self.prices_at(np.asarray([timestamp]))[0])
+
+
+class HistoricalPriceStore:
+    """进程内的价格序列缓存（LRU），序列在 ttl 秒后重新从数据库加载"""
+
+    def __init__(self, ttl=300, max_series=1000):
+        self.ttl = ttl
+        self.max_series = max_series
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def series(self, coin_id, vs_currency="usd"):
+        """返回币种的价格序列；没有任何价格点时返回 None"""
+        key = (coin_id, vs_currency.lower())
+        now = time.monotonic()
+        with self._lock:
+            cached = self._series.get(key)
+            if cached is not None and now - cached[1] < self.ttl:
+                self._series.move_to_end(key)
+                return cached[0]
+
+        rows = (
+            PricePoint.objects.filter(coin_id=key[0], vs_currency=key[1])
+            .order_by("timestamp")
+            .values_list("timestamp", "price")
+        )
+        timestamps, prices = [], []
+        for timestamp, price in rows.iterator(chunk_size=5000):
+            timestamps.append(timestamp)
+            prices.append(price)
+        series = None
+        if timestamps:
+            series = PriceSeries(
+                np.asarray(timestamps, dtype=np.int64),
+                np.asarray(prices, dtype=np.float64),
+            )
+
+        with self._lock:
+            self._series[key] = (series, now)
+            self._series.move_to_end(key)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        return series
+
+    def price_at(self, coin_id, timestamp, vs_currency="usd"):
+        """单个时间点的 as-of 价格；没有历史数据时返回 None"""
+        series = self.series(coin_id, vs_currency)
+        return series.price_at(timestamp) if series is not None else None
+
+    def prices_at(self, coin_id, timestamps, vs_currency="usd"):
+        """批量查询 N 个时间点的价格；没有历史数据时返回 None"""
+        series = self.series(coin_id, vs_currency)
+        if series is None:
+            return None
+        return series.prices_at(np.asarray(timestamps, dtype=np.int64))
+
+    def invalidate(self, coin_id, vs_currency="usd"):
+        with self._lock:
+            self._series.pop((coin_id, vs_currency.lower()), None)
+
+
+_price_store = None
+_price_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """获取进程级共享的历史价格缓存（按 settings.PRICE_HISTORY 配置）"""
+    global _price_store
+    if _price_store is None:
+        with _price_store_lock:
+            if _price_store is None:
+                options = getattr(settings, "PRICE_HISTORY", {})
+                _price_store = HistoricalPriceStore(
+                    ttl=options.get("CACHE_TTL", 300),
+                    max_series=options.get("MAX_SERIES", 1000),
+                )
+    return _price_store
@@ -0,0 +1,143 @@
+import numpy as np
+from django.conf import settings
+
+from core.models import Token
+
+from .market_service import MarketService
+from .market_snapshot import get_snapshot_store
+from .price_history import get_price_store
+
+"""价格服务：按代币提供当前价格与历史价格，供钱包估值与收益分析使用"""
+
+# 估值时从 CoinGecko 列表中读取的代币数量（未启用本地快照时）
+PRICE_LIST_SIZE = 250
+
+
+def _market_tokens(vs_currency):
+    """市场代币列表：优先使用本地市场快照，否则使用经市场数据缓存的 CoinGecko 列表"""
+    tokens = None
+    if settings.MARKET_SNAPSHOT.get("ENABLED", True):
+        tokens = get_snapshot_store().get_tokens(vs_currency)
+    if tokens is None:
+        tokens = MarketService().get_top_tokens(
+            vs_currency.lower(), 1, PRICE_LIST_SIZE
+        )["tokens"]
+    return tokens
+
+
+def _by_symbol(vs_currency, field):
+    # 同一符号以排名靠前者为准
+    values = {}
+    for token in _market_tokens(vs_currency):
+        symbol = (token.get("symbol") or "").upper()
+        if symbol and symbol not in values:
+            values[symbol] = token.get(field)
+    return values
+
+
+def current_prices(vs_currency="usd"):
+    """按代币符号返回当前价格 {SYMBOL: price}，不会为单个钱包请求上游接口"""
+    return {
+        symbol: price or 0
+        for symbol, price in _by_symbol(vs_currency, "price_usd").items()
+    }
+
+
+def coin_ids_by_symbol(vs_currency="usd"):
+    """按代币符号返回 CoinGecko 币种 ID {SYMBOL: coin_id}"""
+    return {
+        symbol: coin_id
+        for symbol, coin_id in _by_symbol(vs_currency, "token_address").items()
+        if coin_id
+    }
+
+
+class CurrentPriceProvider:
+    """价格序列的默认实现：所有时间点都使用当前市场价格（按代币符号匹配）
+
+    实现 prices_at(token_ids, timestamps) 与 current(token_ids) 两个接口即可
+    替换为历史价格来源。没有价格的代币按 0 估值。
+    """
+
+    def __init__(self, vs_currency="usd"):
+        self.vs_currency = vs_currency
+        self._by_token = {}
+        self._symbols = {}
+        self._by_symbol = None
+
+    def prefetch(self, token_ids):
+        """一次查询加载这些代币的价格，后续查找不再访问数据库"""
+        missing = [
+            int(t)
+            for t in set(np.asarray(token_ids).tolist())
+            if t not in self._by_token
+        ]
+        if not missing:
+            return
+        if self._by_symbol is None:
+            self._by_symbol = current_prices(self.vs_currency)
+        for token_id, symbol in Token.objects.filter(pk__in=missing).values_list(
+            "id", "symbol"
+        ):
+            self._symbols[token_id] = symbol.upper()
+            self._by_token[token_id] = float(self._by_symbol.get(symbol.upper()) or 0)
+        for token_id in missing:
+            self._by_token.setdefault(token_id, 0.0)
+
+    def current(self, token_ids):
+        token_ids = np.asarray(token_ids, dtype=np.int64)
+        self.prefetch(token_ids)
+        unique, inverse = np.unique(token_ids, return_inverse=True)
+        prices = np.array([self._by_token[int(t)] for t in unique], dtype=np.float64)
+        return prices[inverse].reshape(token_ids.shape)
+
+    def prices_at(self, token_ids, timestamps):
+        return self.current(token_ids)
+
+
+class HistoricalPriceProvider(CurrentPriceProvider):
+    """使用本地历史价格（ingest_price_history 导入）的价格来源
+
+    代币按符号对应到 CoinGecko 币种；没有历史数据的代币退回当前价格。
+    """
+
+    def __init__(self, vs_currency="usd", store=None):
+        super().__init__(vs_currency)
+        self.store = store or get_price_store()
+        self._series = {}
+        self._coin_ids = None
+
+    def prefetch(self, token_ids):
+        super().prefetch(token_ids)
+        missing = [t for t in self._symbols if t not in self._series]
+        if not missing:
+            return
+        if self._coin_ids is None:
+            self._coin_ids = coin_ids_by_symbol(self.vs_currency)
+        for token_id in missing:
+            coin_id = self._coin_ids.get(self._symbols[token_id])
+            self._series[token_id] = (
+                self.store.series(coin_id, self.vs_currency) if coin_id else None
+            )
+
+    def current(self, token_ids):
+        token_ids = np.asarray(token_ids, dtype=np.int64)
+        prices = super().current(token_ids)
+        # 当前价格缺失时使用最近的历史价格
+        for token_id in np.unique(token_ids):
+            series = self._series.get(int(token_id))
+            if series is not None:
+                mask = (token_ids == token_id) & (prices == 0)
+                prices[mask] = series.prices[-1]
+        return prices
+
+    def prices_at(self, token_ids, timestamps):
+        token_ids = np.asarray(token_ids, dtype=np.int64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = self.current(token_ids)
+        for token_id in np.unique(token_ids):
+            series = self._series.get(int(token_id))
+            if series is not None:
+                mask = token_ids == token_id
+                prices[mask] = series.prices_at(timestamps[mask])
+        return prices
@@ -0,0 +1,184 @@
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from core.models import Favorite, Permission, Token, User
+
+from .cache_backends import build_cache_backend
+
+"""响应缓存：保存已渲染的响应字节与 ETag/Last-Modified，处理条件请求并设置 Cache-Control"""
+
+CATALOG = "catalog"
+
+
+class CachedResponse:
+    __slots__ = ("body", "content_type", "etag", "last_modified")
+
+    def __init__(self, body, content_type, etag, last_modified):
+        self.body = body
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """按键缓存渲染后的响应
+
+    键中包含数据版本（市场快照 ID 或代币目录版本），数据变化后旧条目不再
+    命中，按 TTL 自然淘汰。版本号可以单独放在共享缓存中（versions），
+    这样即使条目缓存在进程内，任一进程的写入也会让所有进程的旧条目失效。
+    """
+
+    def __init__(self, backend, ttl=300, versions=None):
+        self.backend = backend
+        self.versions = versions or backend
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def version(self, namespace):
+        """返回 (版本号, 版本生成时间)；尚无版本时生成一个"""
+        key = f"resp:version:{namespace}"
+        version = self.versions.get(key)
+        if version is None:
+            version = (uuid.uuid4().hex, int(time.time()))
+            if not self.versions.add(key, version, None):
+                version = self.versions.get(key) or version
+        return version
+
+    def bump(self, namespace):
+        self.versions.set(
+            f"resp:version:{namespace}", (uuid.uuid4().hex, int(time.time())), None
+        )
+
+    def respond(
+        self,
+        request,
+        key,
+        render,
+        last_modified=None,
+        cache_control=None,
+        vary=(),
+        ttl=None,
+    ):
+        """返回缓存的响应，未命中时调用 render() 渲染并写入缓存
+
+        render() 可以额外返回 cacheable=False（例如上游请求失败后的空结果），
+        此时不写入缓存，响应使用 Cache-Control: no-store。
+
+        GET/HEAD 请求带有匹配的 If-None-Match / If-Modified-Since 时返回 304。
+
+        Args:
+            request: 请求（已完成内容协商的 DRF Request）
+            key: 缓存键（需要包含数据版本）
+            render: 返回 (body bytes, content_type) 或
+                (body bytes, content_type, cacheable) 的函数
+            last_modified: 数据的最后修改时间（Unix 秒）
+            cache_control: Cache-Control 头的值
+            vary: 追加到 Vary 头的请求头
+            ttl: 覆盖默认的缓存时间
+
+        Returns:
+            HttpResponse
+        """
+        entry = self.backend.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            body, content_type, *rest = render()
+            entry = CachedResponse(
+                body=body,
+                content_type=content_type,
+                etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+                last_modified=last_modified,
+            )
+            if rest and not rest[0]:
+                cache_control = "no-store"
+            else:
+                self.backend.set(key, entry, ttl if ttl is not None else self.ttl)
+        else:
+            self.stats["hits"] += 1
+
+        response = HttpResponse(entry.body, content_type=entry.content_type)
+        response["ETag"] = entry.etag
+        if entry.last_modified is not None:
+            response["Last-Modified"] = http_date(entry.last_modified)
+        if cache_control:
+            response["Cache-Control"] = cache_control
+        if vary:
+            patch_vary_headers(response, vary)
+
+        if request.method in ("GET", "HEAD"):
+            conditional = get_conditional_response(
+                request,
+                etag=entry.etag,
+                last_modified=entry.last_modified,
+                response=response,
+            )
+            if conditional is not response:
+                self.stats["not_modified"] += 1
+            return conditional
+        return response
+
+
+def render_json(request, data):
+    """用协商出的 JSON 渲染器渲染数据，与 DRF Response 的输出一致"""
+    renderer = request.accepted_renderer
+    body = renderer.render(data, request.accepted_media_type, {"request": request})
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type = f"{content_type}; charset={renderer.charset}"
+    return body, content_type
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """获取进程级共享的响应缓存（按 settings.RESPONSE_CACHE 配置）"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                options = getattr(settings, "RESPONSE_CACHE", {})
+                _response_cache = ResponseCache(
+                    backend=build_cache_backend(options, key_prefix="sol:"),
+                    ttl=options.get("TTL", 300),
+                    # 版本号始终放在 CACHES 中（多 worker 部署时为共享缓存）
+                    versions=build_cache_backend(
+                        {"BACKEND": "django", "ALIAS": options.get("ALIAS", "default")},
+                        key_prefix="sol:",
+                    ),
+                )
+    return _response_cache
+
+
+def invalidate_catalog():
+    """代币目录数据变化后使缓存的代币列表失效（事务提交后生效）"""
+    transaction.on_commit(lambda: get_response_cache().bump(CATALOG))
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_catalog_on_change(sender, **kwargs):
+    invalidate_catalog()
+
+
+@receiver(post_save, sender=User)
+def invalidate_catalog_on_user_change(sender, update_fields=None, **kwargs):
+    # 代币列表包含所有者的资料与按角色计算的 can_manage；只更新 last_login 时不失效
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_catalog()
@@ -0,0 +1,207 @@
+from collections import defaultdict
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import (
+    BigIntegerField,
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Trunc
+
+from core.models import Transaction, TransactionRollup, TransactionRollupSender
+
+"""交易汇总服务：按分钟/小时/天维护每个代币的交易量、笔数与发送地址数"""
+
+# 一条 UPDATE 中 CASE 分支（时间桶）的最大数量
+UPDATE_CHUNK_SIZE = 500
+
+INTERVALS = {
+    "1m": ("minute", timedelta(minutes=1)),
+    "1h": ("hour", timedelta(hours=1)),
+    "1d": ("day", timedelta(days=1)),
+}
+
+
+def bucket_start(timestamp, interval):
+    """把时间截断到所在时间桶的起点（UTC）"""
+    timestamp = timestamp.astimezone(dt_timezone.utc)
+    if interval == "1m":
+        return timestamp.replace(second=0, microsecond=0)
+    if interval == "1h":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _sender_count(rollup_ref):
+    return Subquery(
+        TransactionRollupSender.objects.filter(rollup=rollup_ref)
+        .values("rollup")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+
+
+class RollupService:
+    @staticmethod
+    def record(transactions):
+        """把新写入的交易累加到各时间桶
+
+        同一批交易先按 (代币, 粒度, 时间桶) 分组，查询次数与批量大小无关：
+        缺失的桶一次插入、一次读出全部桶 ID、发送地址一次插入，累加则按
+        UPDATE_CHUNK_SIZE 个桶一条 UPDATE（CASE 按桶给出增量）。
+
+        unique_senders 在更新时按发送地址表重新计数，并发写入同一个桶时
+        结果依然正确。
+
+        Args:
+            transactions: 已保存的 Transaction 对象列表
+        """
+        groups = defaultdict(lambda: {"count": 0, "volume": 0, "senders": set()})
+        for tx in transactions:
+            for interval in INTERVALS:
+                group = groups[
+                    (tx.token_id, interval, bucket_start(tx.timestamp, interval))
+                ]
+                group["count"] += 1
+                group["volume"] += tx.amount
+                group["senders"].add(tx.from_address)
+        if not groups:
+            return
+
+        with transaction.atomic():
+            TransactionRollup.objects.bulk_create(
+                [
+                    TransactionRollup(
+                        token_id=token_id, interval=interval, bucket_start=start
+                    )
+                    for token_id, interval, start in groups
+                ],
+                ignore_conflicts=True,
+            )
+            rollup_ids = RollupService._rollup_ids(groups)
+
+            TransactionRollupSender.objects.bulk_create(
+                [
+                    TransactionRollupSender(rollup_id=rollup_ids[key], address=address)
+                    for key, group in groups.items()
+                    for address in group["senders"]
+                ],
+                ignore_conflicts=True,
+            )
+
+            keys = list(groups)
+            for offset in range(0, len(keys), UPDATE_CHUNK_SIZE):
+                chunk = {
+                    rollup_ids[key]: groups[key]
+                    for key in keys[offset : offset + UPDATE_CHUNK_SIZE]
+                }
+                TransactionRollup.objects.filter(pk__in=chunk).update(
+                    tx_count=F("tx_count")
+                    + Case(
+                        *(
+                            When(pk=pk, then=Value(group["count"]))
+                            for pk, group in chunk.items()
+                        ),
+                        output_field=IntegerField(),
+                    ),
+                    volume=F("volume")
+                    + Case(
+                        *(
+                            When(pk=pk, then=Value(group["volume"]))
+                            for pk, group in chunk.items()
+                        ),
+                        output_field=BigIntegerField(),
+                    ),
+                    unique_senders=_sender_count(OuterRef("pk")),
+                )
+
+    @staticmethod
+    def _rollup_ids(keys):
+        """一次查询读出 {(token_id, interval, bucket_start): rollup_id}"""
+        keys = set(keys)
+        rows = TransactionRollup.objects.filter(
+            token_id__in={token_id for token_id, _, _ in keys},
+            interval__in={interval for _, interval, _ in keys},
+            bucket_start__in={start for _, _, start in keys},
+        ).values_list("id", "token_id", "interval", "bucket_start")
+        return {
+            (token_id, interval, start): pk
+            for pk, token_id, interval, start in rows
+            if (token_id, interval, start) in keys
+        }
+
+    @staticmethod
+    def backfill(token_ids=None, intervals=None, batch_size=2000):
+        """根据 Transaction 表重新计算汇总数据（覆盖已有的汇总）
+
+        Args:
+            token_ids: 只处理这些代币，None 表示全部
+            intervals: 只处理这些粒度，None 表示全部
+
+        Returns:
+            dict: {interval: 生成的时间桶数量}
+        """
+        transactions = Transaction.objects.all()
+        rollups = TransactionRollup.objects.all()
+        if token_ids:
+            transactions = transactions.filter(token_id__in=token_ids)
+            rollups = rollups.filter(token_id__in=token_ids)
+
+        created = {}
+        for interval in intervals or INTERVALS:
+            kind = INTERVALS[interval][0]
+            bucketed = transactions.annotate(bucket=Trunc("timestamp", kind))
+            with transaction.atomic():
+                rollups.filter(interval=interval).delete()
+                TransactionRollup.objects.bulk_create(
+                    (
+                        TransactionRollup(
+                            token_id=row["token_id"],
+                            interval=interval,
+                            bucket_start=row["bucket"],
+                            tx_count=row["tx_count"],
+                            volume=row["volume"] or 0,
+                            unique_senders=row["unique_senders"],
+                        )
+                        for row in bucketed.values("token_id", "bucket")
+                        .annotate(
+                            tx_count=Count("id"),
+                            volume=Sum("amount"),
+                            unique_senders=Count("from_address", distinct=True),
+                        )
+                        .order_by()
+                        .iterator(chunk_size=batch_size)
+                    ),
+                    batch_size=batch_size,
+                )
+
+                rollup_ids = {
+                    (token_id, start): pk
+                    for pk, token_id, start in rollups.filter(
+                        interval=interval
+                    ).values_list("id", "token_id", "bucket_start")
+                }
+                senders = (
+                    TransactionRollupSender(
+                        rollup_id=rollup_ids[(row["token_id"], row["bucket"])],
+                        address=row["from_address"],
+                    )
+                    for row in bucketed.values("token_id", "bucket", "from_address")
+                    .distinct()
+                    .order_by()
+                    .iterator(chunk_size=batch_size)
+                )
+                TransactionRollupSender.objects.bulk_create(
+                    senders, batch_size=batch_size, ignore_conflicts=True
+                )
+            created[interval] = len(rollup_ids)
+        return created
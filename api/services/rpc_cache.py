@@ -0,0 +1,104 @@
+import json
+import threading
+
+from .cache_backends import LocalCacheBackend
+
+"""RPC 响应缓存：按 method + params + commitment 缓存 Solana RPC 读请求"""
+
+# 未指定 commitment 时 RPC 节点默认使用 finalized
+DEFAULT_COMMITMENT = "finalized"
+
+# 每个方法在不同 commitment 下的缓存秒数；未列出的方法不缓存
+DEFAULT_TTLS = {
+    "getTokenSupply": {"finalized": 300, "confirmed": 60, "processed": 5},
+    "getMultipleAccounts": {"finalized": 120, "confirmed": 30, "processed": 2},
+    "getAccountInfo": {"finalized": 120, "confirmed": 30, "processed": 2},
+    "getBalance": {"finalized": 30, "confirmed": 10, "processed": 1},
+}
+
+# 会被负缓存的 JSON-RPC 错误码（-32602: 参数非法，例如地址格式错误）
+NEGATIVE_CACHE_CODES = {-32602}
+
+
+def commitment_of(params):
+    """从 RPC 参数的配置对象中取出 commitment"""
+    for param in reversed(params or []):
+        if isinstance(param, dict):
+            return param.get("commitment", DEFAULT_COMMITMENT)
+    return DEFAULT_COMMITMENT
+
+
+class CachedError:
+    """负缓存条目：保存错误信息，命中时重新抛出"""
+
+    def __init__(self, message, code):
+        self.message = message
+        self.code = code
+
+
+class RpcResponseCache:
+    """带 LRU 上限的 RPC 响应缓存，支持负缓存与命中统计"""
+
+    def __init__(self, ttls=None, negative_ttl=300, max_entries=10000):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.negative_ttl = negative_ttl
+        self.backend = LocalCacheBackend(max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "stores": 0}
+
+    def _incr(self, counter):
+        with self._lock:
+            self.stats[counter] += 1
+
+    @staticmethod
+    def key(method, params):
+        return json.dumps([method, params or []], sort_keys=True, separators=(",", ":"))
+
+    def ttl_for(self, method, params):
+        return self.ttls.get(method, {}).get(commitment_of(params))
+
+    def cacheable(self, method, params):
+        return bool(self.ttl_for(method, params))
+
+    def lookup(self, method, params):
+        """查询缓存
+
+        Returns:
+            tuple: (hit, value)；负缓存命中时 value 为 CachedError
+        """
+        if not self.cacheable(method, params):
+            return False, None
+        entry = self.backend.get(self.key(method, params))
+        if entry is None:
+            self._incr("misses")
+            return False, None
+        self._incr("negative_hits" if isinstance(entry, CachedError) else "hits")
+        return True, entry
+
+    def store(self, method, params, value):
+        ttl = self.ttl_for(method, params)
+        if ttl:
+            self.backend.set(self.key(method, params), value, ttl)
+            self._incr("stores")
+
+    def store_error(self, method, params, error):
+        """只缓存确定性的错误（如地址非法），网络或节点错误不缓存"""
+        if self.cacheable(method, params) and error.code in NEGATIVE_CACHE_CODES:
+            self.backend.set(
+                self.key(method, params),
+                CachedError(str(error), error.code),
+                self.negative_ttl,
+            )
+            self._incr("stores")
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats["entries"] = len(self.backend)
+        stats["hit_ratio"] = (
+            round((stats["hits"] + stats["negative_hits"]) / lookups, 4)
+            if lookups
+            else None
+        )
+        return stats
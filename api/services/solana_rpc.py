@@ -0,0 +1,356 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+
+from .address_validation import is_valid_address
+from .http_client import get_http_client
+from .rpc_cache import CachedError, RpcResponseCache
+
+"""Solana RPC 网关：进程级共享连接池、JSON-RPC 批量请求与按节点限流"""
+
+logger = logging.getLogger(__name__)
+
+# getMultipleAccounts 单次最多查询的账户数
+MAX_ACCOUNTS_PER_CALL = 100
+
+
+class RpcError(Exception):
+    """JSON-RPC 返回的错误"""
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+def parse_mint_supply(account):
+    """从 jsonParsed 编码的 Mint 账户中提取供应量，结构与 getTokenSupply 一致"""
+    try:
+        info = account["data"]["parsed"]["info"]
+        return {"total_supply": info["supply"], "decimals": info["decimals"]}
+    except (KeyError, TypeError):
+        return None
+
+
+class RateLimiter:
+    """令牌桶限流器：平均每秒 rate 个请求，允许 burst 个突发"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SolanaRpcGateway:
+    """共享的 Solana RPC 网关
+
+    - 单个调用（call）会在 BATCH_WINDOW_MS 内与其他线程的并发调用合并为
+      一个 JSON-RPC 批量请求
+    - batch() 显式地把多个调用放进一次 HTTP 往返
+    - 所有 HTTP 请求经过同一个按节点的令牌桶限流器
+    """
+
+    def __init__(self, url, options=None):
+        options = options or {}
+        self.url = url
+        self.http = get_http_client("solana_rpc")
+        self.batch_window = options.get("BATCH_WINDOW_MS", 5) / 1000
+        self.max_batch_size = options.get("MAX_BATCH_SIZE", 100)
+        self.limiter = RateLimiter(
+            rate=options.get("RATE_LIMIT", 10), burst=options.get("BURST", 20)
+        )
+        self._ids = itertools.count(1)
+        self._queue = queue.Queue()
+        self._dispatcher = None
+        self._dispatcher_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=options.get("MAX_INFLIGHT_BATCHES", 4),
+            thread_name_prefix="solana-rpc",
+        )
+        self.stats = {"calls": 0, "http_requests": 0, "batched_calls": 0, "errors": 0}
+
+        cache_options = options.get("CACHE", {})
+        self.cache = None
+        if cache_options.get("ENABLED", True):
+            self.cache = RpcResponseCache(
+                ttls=cache_options.get("TTLS"),
+                negative_ttl=cache_options.get("NEGATIVE_TTL", 300),
+                max_entries=cache_options.get("MAX_ENTRIES", 10000),
+            )
+
+    # ---- 底层请求 ----
+
+    def _post(self, payload):
+        self.limiter.acquire()
+        self.stats["http_requests"] += 1
+        response = self.http.post(self.url, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    def batch(self, calls, return_exceptions=False):
+        """在尽量少的 HTTP 往返中执行多个 RPC 调用
+
+        Args:
+            calls: [(method, params), ...]
+            return_exceptions: 为 True 时单个调用的错误以 RpcError 形式放在结果中
+
+        Returns:
+            list: 与 calls 顺序一致的 result 列表
+
+        Raises:
+            RpcError: 任一调用失败且 return_exceptions 为 False
+        """
+        results = []
+        for start in range(0, len(calls), self.max_batch_size):
+            chunk = calls[start : start + self.max_batch_size]
+            results.extend(self._send_batch(chunk))
+        self.stats["calls"] += len(calls)
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, RpcError):
+                    raise result
+        return results
+
+    def _send_batch(self, calls):
+        ids = [next(self._ids) for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "id": call_id, "method": method, "params": params or []}
+            for call_id, (method, params) in zip(ids, calls)
+        ]
+        self.stats["batched_calls"] += len(calls)
+        body = self._post(payload if len(payload) > 1 else payload[0])
+
+        if isinstance(body, dict) and body.get("id") is None and "error" in body:
+            # 整个批量请求被拒绝
+            error = RpcError(body["error"].get("message"), body["error"].get("code"))
+            self.stats["errors"] += len(calls)
+            return [error] * len(calls)
+
+        responses = {
+            item.get("id"): item
+            for item in (body if isinstance(body, list) else [body])
+        }
+        results = []
+        for call_id in ids:
+            item = responses.get(call_id)
+            if item is None:
+                results.append(RpcError("Missing response in batch"))
+            elif "error" in item:
+                self.stats["errors"] += 1
+                results.append(
+                    RpcError(item["error"].get("message"), item["error"].get("code"))
+                )
+            else:
+                results.append(item.get("result"))
+        return results
+
+    # ---- 并发单次调用的自动合并 ----
+
+    def call(self, method, params=None, timeout=30):
+        """执行单个 RPC 调用，与同一时间窗口内的其他调用合并发送
+
+        可缓存的方法先查询响应缓存；非法参数等确定性错误同样会被缓存。
+
+        Returns:
+            RPC 的 result 字段
+
+        Raises:
+            RpcError: RPC 返回错误
+        """
+        if self.cache is not None:
+            hit, value = self.cache.lookup(method, params)
+            if hit:
+                if isinstance(value, CachedError):
+                    raise RpcError(value.message, value.code)
+                return value
+
+        self._ensure_dispatcher()
+        future = Future()
+        self._queue.put((method, params, future))
+        try:
+            result = future.result(timeout=timeout)
+        except RpcError as e:
+            if self.cache is not None:
+                self.cache.store_error(method, params, e)
+            raise
+        if self.cache is not None:
+            self.cache.store(method, params, result)
+        return result
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            with self._dispatcher_lock:
+                if self._dispatcher is None or not self._dispatcher.is_alive():
+                    self._dispatcher = threading.Thread(
+                        target=self._dispatch_loop,
+                        name="solana-rpc-batcher",
+                        daemon=True,
+                    )
+                    self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._flush, pending)
+
+    def _flush(self, pending):
+        # 同一窗口内完全相同的调用只发送一次
+        unique = {}
+        for method, params, future in pending:
+            key = RpcResponseCache.key(method, params)
+            unique.setdefault(key, (method, params, []))[2].append(future)
+        groups = list(unique.values())
+        try:
+            results = self.batch(
+                [(method, params) for method, params, _ in groups],
+                return_exceptions=True,
+            )
+        except Exception as e:
+            for _, _, future in pending:
+                future.set_exception(e)
+            return
+        for (_, _, futures), result in zip(groups, results):
+            for future in futures:
+                if isinstance(result, RpcError):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    # ---- 常用方法 ----
+
+    def get_balance(self, address, commitment="confirmed"):
+        """返回账户余额（lamports）"""
+        result = self.call("getBalance", [address, {"commitment": commitment}])
+        return result["value"]
+
+    def get_token_supply(self, mint, commitment="finalized"):
+        result = self.call("getTokenSupply", [mint, {"commitment": commitment}])
+        return {
+            "total_supply": result["value"]["amount"],
+            "decimals": result["value"]["decimals"],
+        }
+
+    def get_multiple_accounts(
+        self, addresses, encoding="jsonParsed", commitment="confirmed"
+    ):
+        """批量查询账户，每 100 个地址一个调用，所有调用放在同一个批量请求中
+
+        Returns:
+            list: 与 addresses 顺序一致的账户信息（不存在的账户为 None）
+        """
+        calls = [
+            (
+                "getMultipleAccounts",
+                [
+                    addresses[start : start + MAX_ACCOUNTS_PER_CALL],
+                    {"encoding": encoding, "commitment": commitment},
+                ],
+            )
+            for start in range(0, len(addresses), MAX_ACCOUNTS_PER_CALL)
+        ]
+        accounts = []
+        for result in self.batch(calls):
+            accounts.extend(result["value"])
+        return accounts
+
+    def get_token_supplies(self, mints, commitment="finalized"):
+        """批量获取多个 Mint 的供应量
+
+        非法地址不会发送到 RPC 节点，对应结果为 None。与 get_token_supply
+        共用 getTokenSupply 的缓存条目，只有未命中的 Mint 才会查询。
+
+        Returns:
+            dict: {mint: {"total_supply": str, "decimals": int} | None}
+        """
+        supplies = dict.fromkeys(mints)
+        missing = []
+        for mint in dict.fromkeys(mints):
+            if not is_valid_address(mint):
+                continue
+            if self.cache is not None:
+                params = [mint, {"commitment": commitment}]
+                hit, value = self.cache.lookup("getTokenSupply", params)
+                if hit and not isinstance(value, CachedError):
+                    supplies[mint] = {
+                        "total_supply": value["value"]["amount"],
+                        "decimals": value["value"]["decimals"],
+                    }
+                    continue
+            missing.append(mint)
+
+        if missing:
+            accounts = self.get_multiple_accounts(missing, commitment=commitment)
+            for mint, account in zip(missing, accounts):
+                supply = parse_mint_supply(account)
+                supplies[mint] = supply
+                if supply is not None and self.cache is not None:
+                    self.cache.store(
+                        "getTokenSupply",
+                        [mint, {"commitment": commitment}],
+                        {
+                            "value": {
+                                "amount": supply["total_supply"],
+                                "decimals": supply["decimals"],
+                            }
+                        },
+                    )
+        return supplies
+
+
+_gateways = {}
+_gateways_lock = threading.Lock()
+
+
+def get_rpc_gateway(url=None):
+    """获取进程级共享的 RPC 网关（每个节点 URL 一个实例）"""
+    url = url or settings.SOLANA_RPC_URL
+    gateway = _gateways.get(url)
+    if gateway is None:
+        with _gateways_lock:
+            gateway = _gateways.get(url)
+            if gateway is None:
+                gateway = _gateways[url] = SolanaRpcGateway(
+                    url, getattr(settings, "SOLANA_RPC", {})
+                )
+    return gateway
+
+
+def get_rpc_gateway_stats():
+    return {
+        url: {
+            **gateway.stats,
+            "cache": gateway.cache.snapshot() if gateway.cache is not None else None,
+        }
+        for url, gateway in list(_gateways.items())
+    }
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import time
+import weakref
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from core.models import Transaction
+
+from .market_service import MarketService
+from .market_snapshot import get_snapshot_store
+
+"""推送中心：一次上游查询扇出给所有订阅连接（价格变动与新交易），每个连接有独立的有界缓冲"""
+
+logger = logging.getLogger(__name__)
+
+# 推送价格时包含的字段
+PRICE_FIELDS = ("token_address", "symbol", "price_usd", "price_change_24h")
+TRANSACTION_FIELDS = (
+    "id",
+    "token_id",
+    "from_address",
+    "to_address",
+    "amount",
+    "timestamp",
+)
+
+
+def _options():
+    return getattr(settings, "STREAMING", {})
+
+
+class Subscription:
+    """单个连接的订阅：有界发送缓冲，缓冲满时丢弃最旧的消息并记录丢弃数量
+
+    慢客户端只会丢失自己的消息（收到 lagged 事件后自行重新拉取），不会
+    阻塞推送中心或拖慢其他连接。
+    """
+
+    def __init__(self, vs_currency=None, token_ids=(), buffer_size=100):
+        self.vs_currency = vs_currency
+        self.token_ids = frozenset(token_ids)
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def push(self, event, data):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append((event, data))
+        self._ready.set()
+
+    async def next(self, timeout):
+        """等待下一条消息，超时返回 None（用于发送心跳）"""
+        if not self.buffer:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return "lagged", {"dropped": dropped}
+        return self.buffer.popleft()
+
+
+class StreamHub:
+    """每个事件循环一个实例；有订阅时才运行上游轮询任务"""
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.prices = {}
+        self.stats = {"price_polls": 0, "transaction_polls": 0, "published": 0}
+        self._price_tasks = {}
+        self._transaction_task = None
+        self._reset_transaction_cursor()
+
+    def _reset_transaction_cursor(self):
+        # (轮询时间, 当时已见的最大 ID)：用于确定回看窗口的起点
+        self._transaction_marks = deque()
+        self._transaction_floor = None
+        self._seen_transaction_ids = set()
+
+    def subscribe(self, vs_currency=None, token_ids=()):
+        options = _options()
+        subscription = Subscription(
+            vs_currency=vs_currency.lower() if vs_currency else None,
+            token_ids=token_ids,
+            buffer_size=options.get("BUFFER_SIZE", 100),
+        )
+        self.subscriptions.add(subscription)
+
+        if subscription.vs_currency:
+            # 新连接先收到完整的最新价格，之后只收到变动
+            current = self.prices.get(subscription.vs_currency)
+            if current:
+                subscription.push(
+                    "prices",
+                    {
+                        "vs_currency": subscription.vs_currency,
+                        "tokens": list(current.values()),
+                    },
+                )
+            task = self._price_tasks.get(subscription.vs_currency)
+            if task is None or task.done():
+                self._price_tasks[subscription.vs_currency] = asyncio.create_task(
+                    self._poll_prices(subscription.vs_currency)
+                )
+        if subscription.token_ids and (
+            self._transaction_task is None or self._transaction_task.done()
+        ):
+            self._transaction_task = asyncio.create_task(self._poll_transactions())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    def _publish(self, event, data, subscribers):
+        for subscription in subscribers:
+            subscription.push(event, data)
+            self.stats["published"] += 1
+
+    async def _poll_prices(self, vs_currency):
+        interval = _options().get("PRICE_INTERVAL", 5)
+        limit = _options().get("PRICE_LIMIT", 100)
+        while True:
+            subscribers = [
+                s for s in self.subscriptions if s.vs_currency == vs_currency
+            ]
+            if not subscribers:
+                self._price_tasks.pop(vs_currency, None)
+                return
+            try:
+                tokens = await sync_to_async(
+                    self._fetch_prices, thread_sensitive=False
+                )(vs_currency, limit)
+                self.stats["price_polls"] += 1
+                changed = self._diff_prices(vs_currency, tokens)
+                if changed:
+                    self._publish(
+                        "prices",
+                        {"vs_currency": vs_currency, "tokens": changed},
+                        subscribers,
+                    )
+            except Exception:
+                logger.exception("Price stream poll failed")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _fetch_prices(vs_currency, limit):
+        """与 market-list 相同的数据来源：本地快照优先，否则经过市场数据缓存"""
+        if settings.MARKET_SNAPSHOT.get("ENABLED", True):
+            result = get_snapshot_store().get_window(vs_currency, limit, 0)
+            if result is not None:
+                return result["tokens"]
+        return MarketService().get_top_tokens(vs_currency, 1, limit)["tokens"]
+
+    def _diff_prices(self, vs_currency, tokens):
+        previous = self.prices.get(vs_currency, {})
+        current, changed = {}, []
+        for token in tokens:
+            item = {field: token.get(field) for field in PRICE_FIELDS}
+            current[item["token_address"]] = item
+            if previous.get(item["token_address"]) != item:
+                changed.append(item)
+        self.prices[vs_currency] = current
+        return changed
+
+    async def _poll_transactions(self):
+        interval = _options().get("TRANSACTION_INTERVAL", 2)
+        while True:
+            subscribers = [s for s in self.subscriptions if s.token_ids]
+            if not subscribers:
+                self._transaction_task = None
+                self._reset_transaction_cursor()
+                return
+            token_ids = frozenset().union(*(s.token_ids for s in subscribers))
+            try:
+                rows = await sync_to_async(
+                    self._fetch_transactions, thread_sensitive=False
+                )(token_ids)
+                self.stats["transaction_polls"] += 1
+                for row in rows:
+                    self._publish(
+                        "transaction",
+                        row,
+                        [s for s in subscribers if row["token_id"] in s.token_ids],
+                    )
+            except Exception:
+                logger.exception("Transaction stream poll failed")
+            await asyncio.sleep(interval)
+
+    def _fetch_transactions(self, token_ids):
+        """所有订阅代币的新交易只用一条查询获取
+
+        ID 在插入时分配、提交后才可见，较长的事务（例如批量转账）可能在
+        更大的 ID 已被推送之后才提交。因此每次都重新扫描
+        TRANSACTION_LOOKBACK 秒前已见的最大 ID 之后的行，按 ID 去重，
+        晚于该窗口提交的行不再推送。
+        """
+        options = _options()
+        now = time.monotonic()
+        if self._transaction_floor is None:
+            latest = Transaction.objects.order_by("-id").values_list("id", flat=True)
+            self._transaction_floor = latest.first() or 0
+            self._transaction_marks.append((now, self._transaction_floor))
+            return []
+
+        # 窗口起点：回看时间之前最后一次轮询时的最大 ID
+        marks = self._transaction_marks
+        cutoff = now - options.get("TRANSACTION_LOOKBACK", 30)
+        while len(marks) > 1 and marks[1][0] <= cutoff:
+            marks.popleft()
+        if marks[0][0] <= cutoff and marks[0][1] > self._transaction_floor:
+            self._transaction_floor = marks[0][1]
+            self._seen_transaction_ids = {
+                pk for pk in self._seen_transaction_ids if pk > self._transaction_floor
+            }
+
+        rows = []
+        batch = options.get("TRANSACTION_BATCH", 500)
+        queryset = (
+            Transaction.objects.filter(
+                token_id__in=token_ids, id__gt=self._transaction_floor
+            )
+            .order_by("id")
+            .values(*TRANSACTION_FIELDS)
+        )
+        for row in queryset.iterator(chunk_size=batch):
+            if row["id"] in self._seen_transaction_ids:
+                continue
+            self._seen_transaction_ids.add(row["id"])
+            rows.append(row)
+            if len(rows) >= batch:
+                break
+
+        high_water = max(self._seen_transaction_ids, default=self._transaction_floor)
+        marks.append((now, max(high_water, marks[-1][1])))
+        return rows
+
+
+_loop_hubs = weakref.WeakKeyDictionary()
+
+
+def get_stream_hub():
+    """获取当前事件循环的推送中心"""
+    loop = asyncio.get_running_loop()
+    hub = _loop_hubs.get(loop)
+    if hub is None:
+        hub = StreamHub()
+        _loop_hubs[loop] = hub
+    return hub
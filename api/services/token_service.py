@@ -1,10 +1,21 @@
 from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.core.exceptions import PermissionDenied
-from core.models import Token, Transaction, User, Permission # Correct import path
+from django.utils import timezone
+from core.models import SupplyLedgerEntry, Token, Transaction, User # Correct import path
 from decimal import Decimal
 
+from .permission_service import get_permission_resolver
+from .response_cache import invalidate_catalog
+from .transfer_service import TransferService
+
 """代币服务：处理代币相关的业务逻辑"""
 
+# 增发的来源地址（System Program）与销毁的去向地址（Solana incinerator）
+MINT_AUTHORITY_ADDRESS = '11111111111111111111111111111111'
+BURN_ADDRESS = '1nc1nerator11111111111111111111111111111111'
+
 class TokenService:
     @staticmethod
     def manage_token_supply(token, user, action_type, amount):
@@ -24,10 +35,8 @@ class TokenService:
             Token: 更新后的代币对象
         """
         # 权限检查：必须是代币所有者且角色为 token_issuer/admin，或者有 Permission 记录
-        has_perm = Permission.objects.filter(user=user, token=token, can_manage=True).exists()
-        is_owner_issuer = (user.role in ['token_issuer', 'admin']) and (token.owner == user)
-        
-        if not (has_perm or is_owner_issuer):
+        # 与视图层共用同一个解析器，同一请求内不会重复查询 Permission
+        if not get_permission_resolver().can_manage_token(user, token):
             raise PermissionDenied("No permission to manage this token supply.")
 
         if not isinstance(amount, Decimal):
@@ -38,23 +47,105 @@ class TokenService:
         
         if amount <= 0:
              raise ValueError("Amount must be positive")
+        if amount != amount.to_integral_value():
+            raise ValueError("Amount must be an integer")
+        amount = int(amount) # 模型字段是 BigIntegerField
 
-        with transaction.atomic(): # 确保数据库操作原子性
-            # 重新获取 token 对象加锁，防止并发问题
-            token_locked = Token.objects.select_for_update().get(pk=token.pk)
+        if action_type not in ('mint', 'burn'):
+            raise ValueError("Invalid action type. Must be 'mint' or 'burn'.")
 
+        with transaction.atomic(): # 供应量、审计交易与流水同时提交或同时回滚
+            # 单条 UPDATE 完成读改写，不需要 select_for_update 先锁行；
+            # 销毁时余额检查作为 WHERE 条件，影响行数为 0 即余额不足
+            tokens = Token.objects.filter(pk=token.pk)
             if action_type == 'mint':
-                token_locked.total_supply += int(amount) # 模型字段是 BigIntegerField
-            elif action_type == 'burn':
-                if token_locked.total_supply >= int(amount):
-                    token_locked.total_supply -= int(amount)
-                else:
-                    raise ValueError("Insufficient supply to burn")
+                updated = tokens.update(total_supply=F('total_supply') + amount, updated_at=timezone.now())
             else:
-                raise ValueError("Invalid action type. Must be 'mint' or 'burn'.")
+                updated = tokens.filter(total_supply__gte=amount).update(
+                    total_supply=F('total_supply') - amount, updated_at=timezone.now()
+                )
+                if not updated:
+                    raise ValueError("Insufficient supply to burn")
 
-            token_locked.save()
-            # 可以考虑添加一条 Transaction 记录来审计此操作
-            # Transaction.objects.create(...) 
-            
-        return token_locked # 返回更新后的对象
+            audit_tx = TokenService._create_audit_transaction(token, user, action_type, amount)
+            SupplyLedgerEntry.objects.create(
+                token=token,
+                entry_type=action_type,
+                delta=amount if action_type == 'mint' else -amount,
+                actor_id=user.id,
+                transaction=audit_tx,
+            )
+            TransferService.record_created([audit_tx])
+            # 批量 update 不触发 post_save，需要手动使缓存的代币列表失效
+            invalidate_catalog()
+
+        token.refresh_from_db(fields=['total_supply', 'updated_at'])
+        return token # 返回更新后的对象
+
+    @staticmethod
+    def _create_audit_transaction(token, user, action_type, amount):
+        """把增发/销毁记为一笔交易：增发从 System Program 转入操作者，销毁转入 incinerator"""
+        user_address = user.solana_address or MINT_AUTHORITY_ADDRESS
+        if action_type == 'mint':
+            return Transaction.objects.create(
+                token=token,
+                from_address=MINT_AUTHORITY_ADDRESS,
+                to_address=user_address,
+                to_user_id=user.id,
+                amount=amount,
+                timestamp=timezone.now(),
+            )
+        return Transaction.objects.create(
+            token=token,
+            from_address=user_address,
+            from_user_id=user.id,
+            to_address=BURN_ADDRESS,
+            amount=amount,
+            timestamp=timezone.now(),
+        )
+
+    @staticmethod
+    def record_supply_entry(token, entry_type, delta, actor=None):
+        """追加一条不对应增发/销毁操作的流水（初始发行、手工修改总量）"""
+        if delta:
+            SupplyLedgerEntry.objects.create(token=token, entry_type=entry_type, delta=delta, actor_id=actor.id if actor else None)
+
+    @staticmethod
+    def reconcile_supply(token_ids=None, fix=False):
+        """核对每个代币的流水之和与 total_supply 是否一致
+
+        Args:
+            token_ids: 只核对这些代币，None 表示全部
+            fix: 为 True 时为每个不一致的代币追加一条 adjust 流水，使流水与 total_supply 对齐
+
+        Returns:
+            list: 不一致的代币 [{'token_id', 'total_supply', 'ledger_supply', 'difference'}, ...]
+        """
+        tokens = Token.objects.all()
+        if token_ids:
+            tokens = tokens.filter(pk__in=token_ids)
+        ledger_sum = Subquery(
+            SupplyLedgerEntry.objects.filter(token=OuterRef('pk'))
+            .values('token')
+            .annotate(total=Sum('delta'))
+            .values('total')
+        )
+        rows = tokens.annotate(ledger_supply=Coalesce(ledger_sum, 0)).exclude(
+            total_supply=F('ledger_supply')
+        ).values_list('id', 'total_supply', 'ledger_supply')
+
+        mismatches = [
+            {
+                'token_id': token_id,
+                'total_supply': total_supply,
+                'ledger_supply': ledger_supply,
+                'difference': total_supply - ledger_supply,
+            }
+            for token_id, total_supply, ledger_supply in rows
+        ]
+        if fix and mismatches:
+            SupplyLedgerEntry.objects.bulk_create([
+                SupplyLedgerEntry(token_id=item['token_id'], entry_type='adjust', delta=item['difference'])
+                for item in mismatches
+            ])
+        return mismatches
@@ -0,0 +1,131 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Transaction, User
+
+from .address_validation import validate_addresses
+from .balance_service import BalanceService
+from .rollup_service import RollupService
+
+"""转账服务：批量转账的校验与写入，以及交易写入后的派生数据维护"""
+
+MAX_AMOUNT = 2**63 - 1
+
+
+def parse_amount(value):
+    """把请求中的数量解析为正整数（模型字段为 BigIntegerField）
+
+    Returns:
+        int: 解析成功的数量；非法时返回 None
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    if not amount.is_finite() or amount != amount.to_integral_value():
+        return None
+    amount = int(amount)
+    return amount if 0 < amount <= MAX_AMOUNT else None
+
+
+class TransferService:
+    @staticmethod
+    def record_created(transactions):
+        """交易写入后更新派生数据（时间序列汇总、钱包余额）
+
+        Args:
+            transactions: 已保存的 Transaction 对象列表
+        """
+        RollupService.record(transactions)
+        BalanceService.record(transactions)
+
+    @staticmethod
+    def validate_rows(rows):
+        """一次性校验所有转账行
+
+        Returns:
+            tuple: ([(index, to_address, amount), ...], [{'index', 'errors'}, ...])
+        """
+        addresses = [
+            row.get("to_address")
+            for row in rows
+            if isinstance(row, dict) and isinstance(row.get("to_address"), str)
+        ]
+        reasons = validate_addresses(addresses)
+
+        valid, errors = [], []
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors.append(
+                    {
+                        "index": index,
+                        "errors": {"non_field_errors": ["Expected an object"]},
+                    }
+                )
+                continue
+
+            row_errors = {}
+            address = row.get("to_address")
+            if not address:
+                row_errors["to_address"] = ["This field is required."]
+            elif not isinstance(address, str) or reasons.get(address):
+                row_errors["to_address"] = ["Invalid Solana address."]
+
+            amount = parse_amount(row.get("amount"))
+            if amount is None:
+                row_errors["amount"] = ["Amount must be a positive integer."]
+
+            if row_errors:
+                errors.append({"index": index, "errors": row_errors})
+            else:
+                valid.append((index, address, amount))
+        return valid, errors
+
+    @staticmethod
+    def bulk_transfer(token, user, rows, partial=False, chunk_size=1000):
+        """批量转账
+
+        校验全部通过（或 partial=True）时，在一个事务中分块 bulk_create；
+        接收方用户通过一次 solana_address IN 查询解析。
+
+        Args:
+            token (Token): 代币
+            user (User): 发送方（必须已绑定钱包地址）
+            rows: [{'to_address', 'amount'}, ...]
+            partial: 为 True 时跳过非法行，只写入合法行
+            chunk_size: 每次 INSERT 的行数
+
+        Returns:
+            tuple: (写入的 Transaction 列表, 错误列表)
+        """
+        valid, errors = TransferService.validate_rows(rows)
+        if (errors and not partial) or not valid:
+            return [], errors
+
+        recipients = dict(
+            User.objects.filter(
+                solana_address__in={address for _, address, _ in valid}
+            ).values_list("solana_address", "id")
+        )
+        now = timezone.now()
+        objs = [
+            Transaction(
+                token=token,
+                from_address=user.solana_address,
+                from_user_id=user.id,
+                to_address=address,
+                to_user_id=recipients.get(address),
+                amount=amount,
+                timestamp=now,
+            )
+            for _, address, amount in valid
+        ]
+
+        with transaction.atomic():
+            created = Transaction.objects.bulk_create(objs, batch_size=chunk_size)
+            TransferService.record_created(created)
+        return created, errors
@@ -0,0 +1,150 @@
+import logging
+from collections import defaultdict
+
+from django.db.models import Count, Max, Min, Q, Sum
+
+from core.models import Transaction, WalletBalance
+
+from .performance_pipeline import PerformancePipeline
+from .price_service import HistoricalPriceProvider, current_prices
+
+"""钱包分析服务：按地址汇总余额、资金流向与交易对手，并按市场价格估值"""
+
+logger = logging.getLogger(__name__)
+
+TOP_COUNTERPARTIES = 10
+
+
+class WalletAnalyticsService:
+    def __init__(self, vs_currency="usd"):
+        self.vs_currency = vs_currency
+        self.price_provider = HistoricalPriceProvider(vs_currency)
+        self._prices = None
+
+    @property
+    def prices(self):
+        if self._prices is None:
+            try:
+                self._prices = current_prices(self.vs_currency)
+            except Exception:
+                logger.exception("Failed to load prices for wallet valuation")
+                self._prices = {}
+        return self._prices
+
+    def _value(self, symbol, amount):
+        price = self.prices.get(symbol.upper())
+        if price is None:
+            return None, None
+        return price, amount * price
+
+    def _balance_rows(self, address, held_only):
+        balances = WalletBalance.objects.filter(address=address).select_related("token")
+        if held_only:
+            balances = balances.exclude(balance=0)
+        return balances.order_by("token_id")
+
+    def holdings(self, address):
+        """地址持有的代币（余额不为 0），读取增量维护的余额表
+
+        Returns:
+            list: [{'token_id', 'symbol', 'name', 'balance', 'price', 'value'}, ...]
+        """
+        holdings = []
+        for row in self._balance_rows(address, held_only=True):
+            price, value = self._value(row.token.symbol, row.balance)
+            holdings.append(
+                {
+                    "token_id": row.token_id,
+                    "symbol": row.token.symbol,
+                    "name": row.token.name,
+                    "balance": row.balance,
+                    "price": price,
+                    "value": value,
+                }
+            )
+        return holdings
+
+    def counterparties(self, address, limit=TOP_COUNTERPARTIES):
+        """交易对手统计（两条 GROUP BY 查询）
+
+        Returns:
+            tuple: (交易对手总数, 按往来总量排序的前 limit 个交易对手)
+        """
+        parties = defaultdict(lambda: {"sent": 0, "received": 0, "tx_count": 0})
+        sent = (
+            Transaction.objects.filter(from_address=address)
+            .exclude(to_address=address)
+            .values("to_address")
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        for row in sent:
+            party = parties[row["to_address"]]
+            party["sent"] += row["total"] or 0
+            party["tx_count"] += row["count"]
+        received = (
+            Transaction.objects.filter(to_address=address)
+            .exclude(from_address=address)
+            .values("from_address")
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        for row in received:
+            party = parties[row["from_address"]]
+            party["received"] += row["total"] or 0
+            party["tx_count"] += row["count"]
+
+        top = sorted(
+            parties.items(),
+            key=lambda item: item[1]["sent"] + item[1]["received"],
+            reverse=True,
+        )[:limit]
+        return len(parties), [{"address": party, **stats} for party, stats in top]
+
+    def overview(self, address):
+        """账户概览：持仓估值、交易对手与活跃时间（各代币的流入/流出见 performance）"""
+        holdings = self.holdings(address)
+        activity = Transaction.objects.filter(
+            Q(from_address=address) | Q(to_address=address)
+        ).aggregate(
+            tx_count=Count("id"),
+            first_activity=Min("timestamp"),
+            last_activity=Max("timestamp"),
+        )
+        counterparty_count, top_counterparties = self.counterparties(address)
+        return {
+            "address": address,
+            "vs_currency": self.vs_currency,
+            "token_count": len(holdings),
+            "total_value": sum(item["value"] or 0 for item in holdings),
+            **activity,
+            "counterparty_count": counterparty_count,
+            "top_counterparties": top_counterparties,
+            "holdings": holdings,
+        }
+
+    def performance(self, address):
+        """按代币统计资金流向与当前估值（包含已清仓的代币），以及整体收益指标"""
+        tokens = []
+        for row in self._balance_rows(address, held_only=False):
+            price, value = self._value(row.token.symbol, row.balance)
+            tokens.append(
+                {
+                    "token_id": row.token_id,
+                    "symbol": row.token.symbol,
+                    "inflow": row.inflow,
+                    "outflow": row.outflow,
+                    "net_flow": row.inflow - row.outflow,
+                    "balance": row.balance,
+                    "tx_count": row.tx_count,
+                    "price": price,
+                    "value": value,
+                }
+            )
+        return {
+            "address": address,
+            "vs_currency": self.vs_currency,
+            "total_value": sum(item["value"] or 0 for item in tokens),
+            "metrics": PerformancePipeline(self.price_provider).score(address),
+            "tokens": tokens,
+        }
@@ -1,31 +1,74 @@
-from solana.rpc.api import Client
 from django.conf import settings
+
 from core.models import User
 
+from .address_validation import validate_address, validate_addresses
+from .solana_rpc import get_rpc_gateway
+
 """钱包服务：处理Solana钱包相关的操作"""
 
 class WalletService:
     def __init__(self):
-        """初始化Solana客户端连接"""
-        self.client = Client(settings.SOLANA_RPC_URL)
+        """使用进程级共享的 Solana RPC 网关"""
+        self.rpc = get_rpc_gateway()
+        options = getattr(settings, 'WALLET_VALIDATION', {})
+        self.require_on_curve = options.get('REQUIRE_ON_CURVE', False)
+        self.verify_onchain = options.get('VERIFY_ONCHAIN', True)
 
     def verify_wallet_address(self, address):
         """验证Solana钱包地址的有效性
-        
+
+        第一层：离线校验 base58 / 32 字节长度 /（可选）曲线，格式错误直接返回；
+        第二层（可选）：通过 RPC 查询余额确认，结果由 RPC 网关缓存。
+
         Args:
             address: Solana钱包地址
-            
+
         Returns:
             bool: 地址有效返回True，否则返回False
         """
+        if validate_address(address, self.require_on_curve) is not None:
+            return False
+        if not self.verify_onchain:
+            return True
         try:
-            # 验证地址格式和余额
-            response = self.client.get_balance(address)
-            return response.get('result', {}).get('value', 0) is not None
+            return self.rpc.get_balance(address) is not None
         except Exception as e:
             print(f"Wallet verification error: {str(e)}")
             return False
 
+    def validate_addresses(self, addresses, check_onchain=False):
+        """批量校验钱包地址（用于批量导入）
+
+        Args:
+            addresses: 地址列表
+            check_onchain: 是否额外查询链上账户是否存在（每 100 个地址一次调用）
+
+        Returns:
+            list: 每个地址一项 {'address', 'valid', 'reason'[, 'exists_onchain']}
+        """
+        reasons = validate_addresses(addresses, self.require_on_curve)
+        # 按输入顺序逐项返回（重复地址各占一项），结果可按位置与输入对应
+        results = []
+        for address in addresses:
+            key = address if isinstance(address, str) else repr(address)
+            results.append({'address': key, 'valid': reasons[key] is None, 'reason': reasons[key]})
+
+        if check_onchain:
+            # 链上查询只对去重后的合法地址进行
+            valid = [address for address, reason in reasons.items() if reason is None]
+            try:
+                accounts = dict(zip(valid, self.rpc.get_multiple_accounts(valid, encoding='base64')))
+            except Exception as e:
+                print(f"Wallet batch verification error: {str(e)}")
+                accounts = {}
+            for item in results:
+                if item['valid']:
+                    item['exists_onchain'] = (
+                        accounts[item['address']] is not None if item['address'] in accounts else None
+                    )
+        return results
+
     def connect_wallet(self, user, address):
         try:
             if self.verify_wallet_address(address):
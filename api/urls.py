@@ -1,13 +1,28 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r"auth", views.AuthViewSet, basename="auth")
 router.register(r"tokens", views.TokenViewSet, basename="tokens")
+router.register(r"favorites", views.FavoriteViewSet, basename="favorites")
 router.register(r"wallet", views.WalletViewSet, basename="wallet")
+router.register(r"wallets", views.WalletAnalyticsViewSet, basename="wallets")
+router.register(r"metrics", views.MetricsViewSet, basename="metrics")
 
 urlpatterns = [
     path("", include(router.urls)),
+    # 异步接口（ASGI 部署时不占用工作线程）
+    path(
+        "market/tokens/<str:token_address>/",
+        async_views.token_details,
+        name="market-token-details",
+    ),
+    path(
+        "market/onchain-list/",
+        async_views.market_list_onchain,
+        name="market-onchain-list",
+    ),
+    path("stream/", async_views.stream, name="stream"),
 ]
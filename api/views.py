@@ -5,57 +5,133 @@
 
 from decimal import Decimal, InvalidOperation
 
+from django.conf import settings
 from django.contrib.auth import logout  # 导入 logout
 from django.core.exceptions import PermissionDenied
-from django.http import HttpResponseRedirect
+from django.db import transaction
+from django.http import HttpResponseRedirect, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework import viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from core.db_router import use_replica
 from core.models import (  # Correct import path
     Favorite,
-    Permission,
     Token,
     Transaction,
+    TransactionRollup,
     User,
 )
 
+from .authentication import resolve_user
+from .pagination import TimestampCursorPagination
+from .parsers import NDJSONParser
+from .renderers import json_renderer
+
 # 更新导入 (回到 .serializers, core.models)
 from .serializers import (
     FavoriteSerializer,
+    FlatTokenSerializer,
+    FlatTransactionHistorySerializer,
     PermissionSerializer,
     TokenSerializer,
     TransactionSerializer,
     UserSerializer,
 )
+from .services.address_validation import validate_address
+from .services.auth_cache import get_revocation_list
+from .services.favorite_service import get_favorite_service
+from .services.http_client import get_http_client_stats
+from .services.market_cache import get_market_cache
 from .services.market_service import MarketService
+from .services.market_snapshot import get_snapshot_store
+from .services.permission_service import MANAGER_ROLES, get_permission_resolver
+from .services.response_cache import CATALOG, get_response_cache, render_json
+from .services.rollup_service import INTERVALS
+from .services.solana_rpc import get_rpc_gateway_stats
 from .services.token_service import TokenService
+from .services.transfer_service import TransferService
+from .services.wallet_analytics import WalletAnalyticsService
 from .services.wallet_service import WalletService
 
+# timeseries 单次最多返回的时间桶数量
+MAX_TIMESERIES_BUCKETS = 5000
+
+
+def _time_range_filters(request, field):
+    """解析 from/to 查询参数为 ORM 过滤条件"""
+    filters = {}
+    for param, lookup in (("from", "gte"), ("to", "lt")):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValidationError({param: "Invalid datetime, expected ISO 8601"})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        filters[f"{field}__{lookup}"] = parsed
+    return filters
+
+
+def _stream_rows(queryset, serializer, export, filename):
+    """以 NDJSON 或 JSON 数组流式输出查询结果，逐块读取数据库"""
+    rows = queryset.iterator(chunk_size=2000)
+    render = json_renderer().render
+
+    def ndjson():
+        for row in rows:
+            yield render(serializer.to_representation(row)) + b"\n"
+
+    def json_array():
+        yield b"["
+        for index, row in enumerate(rows):
+            prefix = b"," if index else b""
+            yield prefix + render(serializer.to_representation(row))
+        yield b"]"
+
+    if export == "ndjson":
+        response = StreamingHttpResponse(ndjson(), content_type="application/x-ndjson")
+    else:
+        response = StreamingHttpResponse(json_array(), content_type="application/json")
+    extension = "ndjson" if export == "ndjson" else "json"
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    return response
+
+
+class ReplicaReadMixin:
+    """replica_actions 中列出的动作从只读副本读取（路由规则见 core.db_router）"""
+
+    replica_actions = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.action_map.get(request.method.lower()) in self.replica_actions:
+            with use_replica():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
 
 # 自定义权限类 (示例)
 class IsTokenManager(IsAuthenticated):
     def has_object_permission(self, request, view, obj):
         if isinstance(obj, Token):
-            has_perm = Permission.objects.filter(
-                user_id=request.user.id, token=obj, can_manage=True
-            ).exists()
-            is_owner_issuer = (request.user.role in ["token_issuer", "admin"]) and (
-                obj.owner_id == request.user.id
-            )
-            return has_perm or is_owner_issuer
+            return get_permission_resolver().can_manage_token(request.user, obj)
         return False
 
 
 # 用户认证相关视图集
-class AuthViewSet(viewsets.ViewSet):
+class AuthViewSet(ReplicaReadMixin, viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
+    replica_actions = ("get_user",)
 
     serializer_class = UserSerializer
 
@@ -69,6 +145,9 @@ class AuthViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["post"])
     def logout(self, request):
         logout(request)
+        # 访问令牌在过期前不再可用
+        if request.auth is not None:
+            get_revocation_list().revoke(request.auth)
         return Response({"status": "Successfully logged out."})
 
     @action(
@@ -78,7 +157,7 @@ class AuthViewSet(viewsets.ViewSet):
         url_path="me",
     )
     def get_user(self, request):
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(resolve_user(request.user))
         return Response(serializer.data)
 
 
@@ -92,22 +171,127 @@ class WalletViewSet(viewsets.ViewSet):
         if not solana_address:
             return Response({"error": "Solana address is required"}, status=400)
 
+        user = resolve_user(request.user)
         wallet_service = WalletService()
-        if wallet_service.connect_wallet(request.user, solana_address):
-            serializer = UserSerializer(request.user)
+        if wallet_service.connect_wallet(user, solana_address):
+            serializer = UserSerializer(user)
             return Response(serializer.data)
         return Response(
             {"error": "Invalid wallet address or failed to save"}, status=400
         )
 
+    @action(detail=False, methods=["post"])
+    def validate(self, request):
+        """批量校验钱包地址（离线格式校验，可选链上存在性检查）"""
+        addresses = request.data.get("addresses")
+        if not isinstance(addresses, list) or not addresses:
+            return Response({"error": "addresses must be a non-empty list"}, status=400)
+        max_addresses = settings.WALLET_VALIDATION.get("MAX_BATCH_SIZE", 10000)
+        if len(addresses) > max_addresses:
+            return Response(
+                {"error": f"At most {max_addresses} addresses per request"},
+                status=400,
+            )
+
+        # 表单提交时值为字符串，"false"/"0" 不能当作真
+        check_onchain = str(request.data.get("check_onchain", "")).lower() in (
+            "1",
+            "true",
+        )
+        results = WalletService().validate_addresses(
+            addresses, check_onchain=check_onchain
+        )
+        return Response(
+            {
+                "results": results,
+                "valid_count": sum(1 for item in results if item["valid"]),
+                "invalid_count": sum(1 for item in results if not item["valid"]),
+            }
+        )
+
+
+# 钱包分析视图集：按地址查询概览、持仓与资金流向
+class WalletAnalyticsViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+    lookup_field = "address"
+    lookup_value_regex = "[1-9A-HJ-NP-Za-km-z]{32,44}"
+    replica_actions = ("overview", "holdings", "performance")
+
+    def _service(self, request, address):
+        if validate_address(address) is not None:
+            raise ValidationError({"address": "Invalid Solana address"})
+        return WalletAnalyticsService(
+            vs_currency=request.query_params.get("vs_currency", "usd").lower()
+        )
+
+    @action(detail=True, methods=["get"])
+    def overview(self, request, address=None):
+        return Response(self._service(request, address).overview(address))
+
+    @action(detail=True, methods=["get"])
+    def holdings(self, request, address=None):
+        service = self._service(request, address)
+        return Response(
+            {
+                "address": address,
+                "vs_currency": service.vs_currency,
+                "holdings": service.holdings(address),
+            }
+        )
+
+    @action(detail=True, methods=["get"])
+    def performance(self, request, address=None):
+        return Response(self._service(request, address).performance(address))
+
+
+# 运行指标视图（仅管理员）：上游连接池、重试与缓存命中统计
+class MetricsViewSet(viewsets.ViewSet):
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        return Response(
+            {
+                "http_clients": get_http_client_stats(),
+                "market_cache": dict(get_market_cache().stats),
+                "response_cache": dict(get_response_cache().stats),
+                "solana_rpc": get_rpc_gateway_stats(),
+            }
+        )
+
+
+# 收藏视图集
+class FavoriteViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+    replica_actions = ("list",)
+
+    def list(self, request):
+        """当前用户的收藏（含代币与所有者），一次联表查询，按收藏时间倒序"""
+        favorites = list(
+            Favorite.objects.filter(user_id=request.user.id)
+            .select_related("user", "token__owner")
+            .order_by("-created_at", "-id")
+        )
+        # 列表中的代币都已被收藏；不把（可能来自只读副本的）结果写入收藏缓存
+        for favorite in favorites:
+            favorite.token.is_favorite = True
+        serializer = FavoriteSerializer(
+            favorites, many=True, context={"request": request}
+        )
+        return Response(serializer.data)
+
 
 # 代币管理视图集
-class TokenViewSet(viewsets.ModelViewSet):
+class TokenViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    replica_actions = ("list", "history")
 
     serializer_class = TokenSerializer
     queryset = Token.objects.filter(is_active=True)
 
+    def get_queryset(self):
+        # 收藏数读取冗余列，is_favorite 由用户的收藏集合判断，不再联表计数
+        return super().get_queryset().select_related("owner")
+
     def get_permissions(self):
         if self.action == "market_list":
             # 仅 market-list 开放
@@ -121,28 +305,94 @@ class TokenViewSet(viewsets.ModelViewSet):
         context.update({"request": self.request})
         return context
 
-    @action(detail=False, methods=["post"], url_path="market-list")
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            token = serializer.save()
+            TokenService.record_supply_entry(token, "issue", token.total_supply)
+
+    def list(self, request, *args, **kwargs):
+        # 列表包含当前用户的 is_favorite/can_manage，按用户缓存渲染结果
+        if request.accepted_renderer.format != "json":
+            return super().list(request, *args, **kwargs)
+        cache = get_response_cache()
+        version, changed_at = cache.version(CATALOG)
+        return cache.respond(
+            request,
+            f"resp:tokens:{version}:{request.user.id}:{request.accepted_media_type}",
+            lambda: render_json(request, self._list_data(request)),
+            last_modified=changed_at,
+            cache_control="private, no-cache",
+            vary=("Accept", "Authorization"),
+            ttl=settings.RESPONSE_CACHE.get("TOKEN_LIST_TTL", 10),
+        )
+
+    def _list_data(self, request):
+        # 扁平序列化直接读取 values() 行，输出与 TokenSerializer 一致
+        queryset = self.filter_queryset(self.get_queryset())
+        return FlatTokenSerializer(request.user).serialize(queryset)
+
+    @action(detail=False, methods=["get", "post"], url_path="market-list")
     def market_list(self, request):
-        vs_currency = request.data.get("vs_currency", "usd").upper()
-        limit = int(request.data.get("limit", 10))
-        offset = int(request.data.get("offset", 0))
+        """市场代币列表（公开）
+
+        GET 使用查询参数，可被 CDN 缓存；POST 使用请求体（兼容旧客户端）。
+        已渲染的响应按 (vs_currency, limit, offset, 快照) 缓存。
+        """
+        params = request.query_params if request.method == "GET" else request.data
+        vs_currency = params.get("vs_currency", "usd").upper()
+        limit = int(params.get("limit", 10))
+        offset = int(params.get("offset", 0))
+        if request.accepted_renderer.format != "json":
+            return Response(self._market_window(vs_currency, limit, offset))
+
+        options = settings.RESPONSE_CACHE
+        snapshot_id, finished_at = None, None
+        if settings.MARKET_SNAPSHOT.get("ENABLED", True):
+            snapshot_id, finished_at = get_snapshot_store().snapshot_info(vs_currency)
+        return get_response_cache().respond(
+            request,
+            f"resp:market:{vs_currency}:{limit}:{offset}:{snapshot_id or 'live'}:"
+            f"{request.accepted_media_type}",
+            lambda: self._render_market(request, vs_currency, limit, offset),
+            last_modified=int(finished_at.timestamp()) if finished_at else None,
+            cache_control=(
+                f"public, max-age={options['MARKET_MAX_AGE']}, "
+                f"stale-while-revalidate={options['MARKET_STALE_WHILE_REVALIDATE']}"
+                if request.method == "GET"
+                else None
+            ),
+            vary=("Accept",),
+            # 没有本地快照时数据来自市场数据缓存，缓存时间与其新鲜期一致
+            ttl=None if snapshot_id else settings.MARKET_CACHE.get("TTL", 60),
+        )
+
+    def _render_market(self, request, vs_currency, limit, offset):
+        # CoinGecko 请求失败时 get_top_tokens 返回空列表；空结果不缓存，
+        # 也不让 CDN 缓存，上游恢复后下一个请求即可拿到数据
+        data = self._market_window(vs_currency, limit, offset)
+        return (*render_json(request, data), bool(data.get("tokens")))
+
+    @staticmethod
+    def _market_window(vs_currency, limit, offset):
+        # 优先使用后台任务写入的本地快照，无需请求 CoinGecko
+        if settings.MARKET_SNAPSHOT.get("ENABLED", True):
+            result = get_snapshot_store().get_window(vs_currency, limit, offset)
+            if result is not None:
+                return result
 
         # 计算 per_page 和 page
         per_page = limit
         page = (offset // limit) + 1 if limit > 0 else 1
 
         market_service = MarketService()
-        result = market_service.get_top_tokens(
+        return market_service.get_top_tokens(
             vs_currency=vs_currency, page=page, per_page=per_page
         )
-        return Response(result)
 
     @action(detail=True, methods=["post"])
     def favorite(self, request, pk=None):
         token = self.get_object()
-        favorite, created = Favorite.objects.get_or_create(
-            user_id=request.user.id, token=token
-        )
+        created = get_favorite_service().add(request.user, token)
         if created:
             return Response({"status": "token favorited"})
         else:
@@ -151,10 +401,7 @@ class TokenViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"])
     def unfavorite(self, request, pk=None):
         token = self.get_object()
-        deleted_count, _ = Favorite.objects.filter(
-            user_id=request.user.id, token=token
-        ).delete()
-        if deleted_count > 0:
+        if get_favorite_service().remove(request.user, token):
             return Response({"status": "token unfavorited"})
         else:
             return Response({"status": "token was not favorited"})
@@ -185,18 +432,120 @@ class TokenViewSet(viewsets.ModelViewSet):
         )
 
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                transaction_obj = serializer.save()
+                TransferService.record_created([transaction_obj])
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="transfers/bulk",
+        parser_classes=[*api_settings.DEFAULT_PARSER_CLASSES, NDJSONParser],
+    )
+    def bulk_transfer(self, request, pk=None):
+        """批量转账
+
+        请求体：JSON 数组、{"transfers": [...], "partial": true}，
+        或 application/x-ndjson（每行一个转账）。
+        partial 也可以通过查询参数 ?partial=true 指定：为真时跳过非法行，
+        否则只要有一行非法就整体拒绝。
+        """
+        token = self.get_object()
+        if not request.user.solana_address:
+            return Response(
+                {"error": "User has no Solana address connected"}, status=400
+            )
+
+        data = request.data
+        partial = request.query_params.get("partial", "").lower() in ("1", "true")
+        if isinstance(data, dict):
+            partial = partial or bool(data.get("partial", False))
+            data = data.get("transfers")
+        if not isinstance(data, list) or not data:
+            return Response(
+                {"error": "Expected a non-empty list of transfers"}, status=400
+            )
+
+        options = settings.BULK_TRANSFER
+        if len(data) > options["MAX_ROWS"]:
+            return Response(
+                {"error": f"At most {options['MAX_ROWS']} transfers per request"},
+                status=400,
+            )
+
+        created, errors = TransferService.bulk_transfer(
+            token=token,
+            user=request.user,
+            rows=data,
+            partial=partial,
+            chunk_size=options["CHUNK_SIZE"],
+        )
+        status = 400 if errors and not created else 201
+        return Response(
+            {"created": len(created), "failed": len(errors), "errors": errors},
+            status=status,
+        )
+
     @action(detail=True, methods=["get"])
     def history(self, request, pk=None):
+        """交易历史：按 (timestamp, id) 游标分页
+
+        查询参数：
+            from / to: ISO 8601 时间范围（含 from，不含 to）
+            cursor / page_size: 游标分页
+            export=ndjson|json: 流式导出全部结果（内存占用恒定）
+        """
         token = self.get_object()
-        transactions = Transaction.objects.filter(token=token).order_by("-timestamp")
-        serializer = TransactionSerializer(
-            transactions, many=True, context=self.get_serializer_context()
+        transactions = (
+            Transaction.objects.filter(token=token)
+            .filter(**_time_range_filters(request, "timestamp"))
+            .values(*FlatTransactionHistorySerializer.fields)
         )
-        return Response(serializer.data)
+
+        export = request.query_params.get("export")
+        if export in ("ndjson", "json"):
+            return _stream_rows(
+                transactions.order_by("-timestamp", "-id"),
+                FlatTransactionHistorySerializer(),
+                export,
+                filename=f"token-{token.id}-history",
+            )
+
+        paginator = TimestampCursorPagination()
+        page = paginator.paginate_queryset(transactions, request)
+        serializer = FlatTransactionHistorySerializer()
+        return paginator.get_paginated_response(
+            [serializer.to_representation(row) for row in page]
+        )
+
+    @action(detail=True, methods=["get"])
+    def timeseries(self, request, pk=None):
+        """交易趋势图数据：直接读取预先汇总的时间桶
+
+        查询参数：
+            interval: 1m / 1h / 1d（默认 1h）
+            from / to: ISO 8601 时间范围（含 from，不含 to）
+        """
+        token = self.get_object()
+        interval = request.query_params.get("interval", "1h")
+        if interval not in INTERVALS:
+            return Response(
+                {"error": f"interval must be one of {', '.join(INTERVALS)}"},
+                status=400,
+            )
+
+        buckets = list(
+            TransactionRollup.objects.filter(token=token, interval=interval)
+            .filter(**_time_range_filters(request, "bucket_start"))
+            .order_by("-bucket_start")
+            .values("bucket_start", "tx_count", "volume", "unique_senders")[
+                :MAX_TIMESERIES_BUCKETS
+            ]
+        )
+        buckets.reverse()
+        return Response({"interval": interval, "buckets": buckets})
 
     @action(detail=True, methods=["post"])
     def manage(self, request, pk=None):
@@ -204,10 +553,7 @@ class TokenViewSet(viewsets.ModelViewSet):
 
         if not IsTokenManager().has_object_permission(request, self, token):
             return Response({"error": "Permission denied"}, status=403)
-        if token.owner_id != request.user.id and request.user.role not in [
-            "admin",
-            "token_issuer",
-        ]:
+        if token.owner_id != request.user.id and request.user.role not in MANAGER_ROLES:
             return Response(
                 {"error": "Permission denied. Not owner or manager."}, status=403
             )
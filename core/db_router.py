@@ -0,0 +1,91 @@
+"""
+数据库路由：写操作走主库，标记为只读的接口从只读副本读取
+
+- 默认所有读写都走主库（default）；
+- 视图通过 use_replica() 声明本次请求的读取可以走副本；
+- 本次请求发生写操作后，后续读取固定走主库；
+- 写请求成功后通过 cookie 在 PIN_SECONDS 内把同一客户端的读取固定到主库
+  （read-your-writes），避免副本复制延迟导致读到旧数据。
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_replica_allowed = ContextVar("replica_allowed", default=False)
+_primary_pinned = ContextVar("primary_pinned", default=False)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _options():
+    return getattr(settings, "DATABASE_ROUTING", {})
+
+
+def replica_alias():
+    """已配置的只读副本别名，未配置时返回 None"""
+    alias = _options().get("REPLICA_ALIAS", "replica")
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def use_replica():
+    """在该上下文内的读取可以走只读副本"""
+    token = _replica_allowed.set(True)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+def pin_primary():
+    """把当前请求剩余的读取固定到主库"""
+    _primary_pinned.set(True)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_allowed.get() and not _primary_pinned.get():
+            return replica_alias() or DEFAULT_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 副本与主库数据相同，跨库关联是安全的
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryPinningMiddleware:
+    """按请求设置主库固定状态，并在写请求成功后下发固定 cookie"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = _options()
+        cookie = options.get("PIN_COOKIE", "db_primary_pin")
+        token = _primary_pinned.set(cookie in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _primary_pinned.reset(token)
+
+        pin_seconds = options.get("PIN_SECONDS", 5)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and pin_seconds > 0
+            and replica_alias()
+        ):
+            response.set_cookie(
+                cookie, "1", max_age=pin_seconds, httponly=True, samesite="Lax"
+            )
+        return response
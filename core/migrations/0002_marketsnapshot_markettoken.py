@@ -0,0 +1,69 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MarketSnapshot",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("vs_currency", models.CharField(db_index=True, max_length=10)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "Running"),
+                            ("success", "Success"),
+                            ("failed", "Failed"),
+                        ],
+                        default="running",
+                        max_length=10,
+                    ),
+                ),
+                ("token_count", models.IntegerField(default=0)),
+                ("upserted_count", models.IntegerField(default=0)),
+                ("removed_count", models.IntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="MarketToken",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("vs_currency", models.CharField(max_length=10)),
+                ("token_address", models.CharField(max_length=100)),
+                ("rank", models.IntegerField()),
+                ("symbol", models.CharField(db_index=True, max_length=50)),
+                ("data", models.JSONField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "snapshot",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="tokens",
+                        to="core.marketsnapshot",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["vs_currency", "rank"],
+                        name="core_market_vs_curr_29f8b8_idx",
+                    )
+                ],
+                "unique_together": {("vs_currency", "token_address")},
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_marketsnapshot_markettoken"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionRollup",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "interval",
+                    models.CharField(
+                        choices=[("1m", "Minute"), ("1h", "Hour"), ("1d", "Day")],
+                        max_length=2,
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                ("tx_count", models.IntegerField(default=0)),
+                ("volume", models.BigIntegerField(default=0)),
+                ("unique_senders", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "token",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="core.token",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("token", "interval", "bucket_start")},
+            },
+        ),
+        migrations.CreateModel(
+            name="TransactionRollupSender",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("address", models.CharField(max_length=44)),
+                (
+                    "rollup",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="senders",
+                        to="core.transactionrollup",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("rollup", "address")},
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_issue_entries(apps, schema_editor):
+    """为已有代币写入初始发行记录，使流水之和等于当前 total_supply"""
+    Token = apps.get_model("core", "Token")
+    SupplyLedgerEntry = apps.get_model("core", "SupplyLedgerEntry")
+    SupplyLedgerEntry.objects.bulk_create(
+        (
+            SupplyLedgerEntry(token_id=token_id, entry_type="issue", delta=total_supply)
+            for token_id, total_supply in Token.objects.values_list(
+                "id", "total_supply"
+            ).iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_transactionrollup_transactionrollupsender"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SupplyLedgerEntry",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "entry_type",
+                    models.CharField(
+                        choices=[
+                            ("issue", "Issue"),
+                            ("mint", "Mint"),
+                            ("burn", "Burn"),
+                            ("adjust", "Adjust"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("delta", models.BigIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="supply_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "token",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="supply_ledger",
+                        to="core.token",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="supply_entry",
+                        to="core.transaction",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(seed_issue_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_supplyledgerentry"),
+    ]
+
+    operations = [
+        # 先建新索引再删除旧索引，迁移过程中查询始终有索引可用
+        migrations.AddIndex(
+            model_name="token",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["id"],
+                name="token_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["token", "-timestamp", "-id"], name="tx_token_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["from_address", "-timestamp"], name="tx_from_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["to_address", "-timestamp"], name="tx_to_time_idx"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="favorite",
+            name="core_favori_user_id_94e484_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="permission",
+            name="core_permis_user_id_1b2ead_idx",
+        ),
+        migrations.AlterField(
+            model_name="favorite",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="favorites",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="permission",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="permissions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="transaction",
+            name="from_address",
+            field=models.CharField(max_length=44),
+        ),
+        migrations.AlterField(
+            model_name="transaction",
+            name="timestamp",
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name="transaction",
+            name="to_address",
+            field=models.CharField(max_length=44),
+        ),
+        migrations.AlterField(
+            model_name="transaction",
+            name="token",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transactions",
+                to="core.token",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_query_shape_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WalletBalance",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("address", models.CharField(max_length=44)),
+                ("balance", models.BigIntegerField(default=0)),
+                ("inflow", models.BigIntegerField(default=0)),
+                ("outflow", models.BigIntegerField(default=0)),
+                ("tx_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "token",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="wallet_balances",
+                        to="core.token",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("address", "token")},
+            },
+        ),
+    ]
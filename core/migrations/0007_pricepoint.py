@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_walletbalance"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PricePoint",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("coin_id", models.CharField(max_length=100)),
+                ("vs_currency", models.CharField(max_length=10)),
+                ("timestamp", models.BigIntegerField()),
+                ("price", models.FloatField()),
+            ],
+            options={
+                "unique_together": {("coin_id", "vs_currency", "timestamp")},
+            },
+        ),
+    ]
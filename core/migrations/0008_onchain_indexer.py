@@ -0,0 +1,55 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_pricepoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexerCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("address", models.CharField(max_length=44, unique=True)),
+                (
+                    "last_signature",
+                    models.CharField(blank=True, max_length=88, null=True),
+                ),
+                ("last_slot", models.BigIntegerField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="token",
+            name="mint_address",
+            field=models.CharField(blank=True, max_length=44, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="instruction_index",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="signature",
+            field=models.CharField(blank=True, max_length=88, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="transaction",
+            constraint=models.UniqueConstraint(
+                fields=("signature", "instruction_index"), name="tx_onchain_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_favorited_count(apps, schema_editor):
+    """按已有的 Favorite 记录回填收藏数（单条 UPDATE）"""
+    Token = apps.get_model("core", "Token")
+    Favorite = apps.get_model("core", "Favorite")
+    counts = (
+        Favorite.objects.filter(token_id=OuterRef("pk"))
+        .order_by()
+        .values("token_id")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Token.objects.update(favorited_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_tokenrevocation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="token",
+            name="favorited_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_favorited_count, migrations.RunPython.noop),
+    ]
@@ -99,19 +99,34 @@ class Token(models.Model):
         db_index=True,
     )
     is_active = models.BooleanField(default=True)
+    # 链上 SPL Mint 地址；设置后由 index_onchain 同步链上转账
+    mint_address = models.CharField(max_length=44, unique=True, null=True, blank=True)
+    # 收藏数（冗余计数，随 Favorite 的增删在同一事务内用 F() 更新）
+    favorited_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # 代币列表只查询 is_active=True 的行
+            models.Index(
+                fields=["id"],
+                condition=models.Q(is_active=True),
+                name="token_active_idx",
+            )
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.symbol})"
 
 
 class Transaction(models.Model):
     id = models.BigAutoField(primary_key=True)
+    # 以下字段的查询由 Meta.indexes 中的组合索引覆盖
     token = models.ForeignKey(
-        Token, on_delete=models.CASCADE, related_name="transactions", db_index=True
+        Token, on_delete=models.CASCADE, related_name="transactions", db_index=False
     )
-    from_address = models.CharField(max_length=44, db_index=True)
+    from_address = models.CharField(max_length=44)
     from_user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         null=True,
@@ -119,7 +134,7 @@ class Transaction(models.Model):
         on_delete=models.SET_NULL,
         related_name="transactions_sent",
     )
-    to_address = models.CharField(max_length=44, db_index=True)
+    to_address = models.CharField(max_length=44)
     to_user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         null=True,
@@ -128,10 +143,32 @@ class Transaction(models.Model):
         related_name="transactions_received",
     )
     amount = models.BigIntegerField()
-    timestamp = models.DateTimeField(db_index=True)
+    timestamp = models.DateTimeField()
+    # 链上交易来源：交易签名与转账指令在交易内的序号（本地转账为空）
+    signature = models.CharField(max_length=88, null=True, blank=True)
+    instruction_index = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # 重复索引同一笔链上交易时写入被忽略
+            models.UniqueConstraint(
+                fields=["signature", "instruction_index"], name="tx_onchain_uniq"
+            )
+        ]
+        indexes = [
+            # 代币交易历史：WHERE token_id = ? ORDER BY timestamp DESC, id DESC
+            models.Index(
+                fields=["token", "-timestamp", "-id"], name="tx_token_time_idx"
+            ),
+            # 钱包活动：某地址发出/收到的交易按时间倒序
+            models.Index(
+                fields=["from_address", "-timestamp"], name="tx_from_time_idx"
+            ),
+            models.Index(fields=["to_address", "-timestamp"], name="tx_to_time_idx"),
+        ]
+
     def __str__(self):
         return f"Tx {self.id}: {self.amount} {self.token.symbol} from {self.from_address[:6]} to {self.to_address[:6]}"
 
@@ -142,7 +179,7 @@ class Favorite(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="favorites",
-        db_index=True,
+        db_index=False,
     )
     token = models.ForeignKey(
         Token, on_delete=models.CASCADE, related_name="favorited_by", db_index=True
@@ -151,8 +188,8 @@ class Favorite(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        # 唯一约束自带 (user, token) 索引，也覆盖按 user 的查询
         unique_together = ["user", "token"]
-        indexes = [models.Index(fields=["user", "token"])]
 
     def __str__(self):
         return f"User {self.user_id} favorites Token {self.token_id}"
@@ -164,7 +201,7 @@ class Permission(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="permissions",
-        db_index=True,
+        db_index=False,
     )
     token = models.ForeignKey(
         Token, on_delete=models.CASCADE, related_name="permissions", db_index=True
@@ -174,9 +211,199 @@ class Permission(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        # 唯一约束自带 (user, token) 索引，也覆盖按 user 的查询
         unique_together = ["user", "token"]
-        indexes = [models.Index(fields=["user", "token"])]
 
     def __str__(self):
         status = "can manage" if self.can_manage else "cannot manage"
         return f"User {self.user_id} {status} Token {self.token_id}"
+
+
+class MarketSnapshot(models.Model):
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("success", "Success"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    vs_currency = models.CharField(max_length=10, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="running")
+    token_count = models.IntegerField(default=0)
+    upserted_count = models.IntegerField(default=0)
+    removed_count = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Snapshot {self.id} ({self.vs_currency}, {self.status})"
+
+
+class MarketToken(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    vs_currency = models.CharField(max_length=10)
+    token_address = models.CharField(max_length=100)
+    rank = models.IntegerField()
+    symbol = models.CharField(max_length=50, db_index=True)
+    # 与 MarketService.get_top_tokens 返回的单个代币字典结构一致
+    data = models.JSONField()
+    snapshot = models.ForeignKey(
+        MarketSnapshot, on_delete=models.SET_NULL, null=True, related_name="tokens"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ["vs_currency", "token_address"]
+        indexes = [models.Index(fields=["vs_currency", "rank"])]
+
+    def __str__(self):
+        return f"{self.symbol} #{self.rank} ({self.vs_currency})"
+
+
+class TransactionRollup(models.Model):
+    INTERVAL_CHOICES = [
+        ("1m", "Minute"),
+        ("1h", "Hour"),
+        ("1d", "Day"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    token = models.ForeignKey(Token, on_delete=models.CASCADE, related_name="rollups")
+    interval = models.CharField(max_length=2, choices=INTERVAL_CHOICES)
+    bucket_start = models.DateTimeField()
+    tx_count = models.IntegerField(default=0)
+    volume = models.BigIntegerField(default=0)
+    unique_senders = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ["token", "interval", "bucket_start"]
+
+    def __str__(self):
+        return f"Token {self.token_id} {self.interval} @ {self.bucket_start}"
+
+
+class TransactionRollupSender(models.Model):
+    """每个时间桶内出现过的发送地址，用于增量维护 unique_senders"""
+
+    id = models.BigAutoField(primary_key=True)
+    rollup = models.ForeignKey(
+        TransactionRollup, on_delete=models.CASCADE, related_name="senders"
+    )
+    address = models.CharField(max_length=44)
+
+    class Meta:
+        unique_together = ["rollup", "address"]
+
+    def __str__(self):
+        return f"{self.address[:6]} in rollup {self.rollup_id}"
+
+
+class SupplyLedgerEntry(models.Model):
+    """代币供应量变动流水（只追加不修改），各行 delta 之和应等于 total_supply"""
+
+    ENTRY_TYPE_CHOICES = [
+        ("issue", "Issue"),
+        ("mint", "Mint"),
+        ("burn", "Burn"),
+        ("adjust", "Adjust"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    token = models.ForeignKey(
+        Token, on_delete=models.CASCADE, related_name="supply_ledger"
+    )
+    entry_type = models.CharField(max_length=10, choices=ENTRY_TYPE_CHOICES)
+    # 增发为正，销毁为负
+    delta = models.BigIntegerField()
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="supply_entries",
+    )
+    transaction = models.OneToOneField(
+        Transaction,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="supply_entry",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Token {self.token_id} {self.entry_type} {self.delta:+d}"
+
+
+class WalletBalance(models.Model):
+    """每个 (地址, 代币) 的余额与累计流入/流出，随交易写入增量维护"""
+
+    id = models.BigAutoField(primary_key=True)
+    address = models.CharField(max_length=44)
+    token = models.ForeignKey(
+        Token, on_delete=models.CASCADE, related_name="wallet_balances"
+    )
+    balance = models.BigIntegerField(default=0)
+    inflow = models.BigIntegerField(default=0)
+    outflow = models.BigIntegerField(default=0)
+    tx_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ["address", "token"]
+
+    def __str__(self):
+        return f"{self.address[:6]} holds {self.balance} of Token {self.token_id}"
+
+
+class PricePoint(models.Model):
+    """历史价格（窄表）：CoinGecko 币种在某一时刻的价格，时间为 Unix 秒"""
+
+    id = models.BigAutoField(primary_key=True)
+    coin_id = models.CharField(max_length=100)
+    vs_currency = models.CharField(max_length=10)
+    timestamp = models.BigIntegerField()
+    price = models.FloatField()
+
+    class Meta:
+        unique_together = ["coin_id", "vs_currency", "timestamp"]
+
+    def __str__(self):
+        return f"{self.coin_id}/{self.vs_currency} @ {self.timestamp}: {self.price}"
+
+
+class IndexerCheckpoint(models.Model):
+    """链上索引进度：每个被跟踪的地址记录最后处理的签名与 slot"""
+
+    address = models.CharField(max_length=44, unique=True)
+    last_signature = models.CharField(max_length=88, null=True, blank=True)
+    last_slot = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.address} @ {self.last_slot}"
+
+
+class TokenRevocation(models.Model):
+    """JWT 吊销名单
+
+    jti 非空：该访问令牌被吊销（退出登录）。
+    jti 为空：该用户在 claims_before 之前签发的令牌中的声明已过时，
+    认证时改为从数据库加载用户。
+    expires_at 之后相关令牌都已过期，记录可以清理。
+    """
+
+    jti = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="token_revocations",
+    )
+    claims_before = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Revocation {self.jti or 'claims'} for User {self.user_id}"
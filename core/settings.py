@@ -14,11 +14,56 @@ ALLOWED_HOSTS = config(
 )
 
 # Database configuration
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DB_ENGINE=postgresql 时使用 PostgreSQL，未配置时使用本地 SQLite（仅用于开发）
+DB_ENGINE = config("DB_ENGINE", default="sqlite3")
+
+if DB_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": config("DB_NAME", default="solana_wallet_db"),
+            "USER": config("DB_USER", default="solana_wallet_user"),
+            "PASSWORD": config("DB_PASSWORD", default=""),
+            "HOST": config("DB_HOST", default="localhost"),
+            "PORT": config("DB_PORT", default="5432"),
+            # 持久连接：每个 worker 复用连接，避免每个请求重新握手
+            "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=60, cast=int),
+            "CONN_HEALTH_CHECKS": config(
+                "DB_CONN_HEALTH_CHECKS", default=True, cast=bool
+            ),
+            "OPTIONS": {
+                "connect_timeout": config("DB_CONNECT_TIMEOUT", default=5, cast=int),
+            },
+        }
+    }
+    # 通过 PgBouncer（transaction 模式）做服务端连接池时，服务端游标不可用
+    if config("DB_PGBOUNCER", default=False, cast=bool):
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+    # 只读副本：配置 DB_REPLICA_HOST 后，部分只读接口从副本读取
+    DB_REPLICA_HOST = config("DB_REPLICA_HOST", default="")
+    if DB_REPLICA_HOST:
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "HOST": DB_REPLICA_HOST,
+            "PORT": config("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+            "TEST": {"MIRROR": "default"},
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        }
     }
+
+DATABASE_ROUTERS = ["core.db_router.PrimaryReplicaRouter"]
+
+DATABASE_ROUTING = {
+    "REPLICA_ALIAS": "replica",
+    # 写操作之后在该时间内（秒）同一客户端的读取固定走主库，避免副本延迟读到旧数据
+    "PIN_SECONDS": config("DB_PIN_SECONDS", default=5, cast=int),
+    "PIN_COOKIE": "db_primary_pin",
 }
 
 # Application definition
@@ -55,11 +100,13 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",  # 添加这行
     "django.contrib.messages.middleware.MessageMiddleware",
     "allauth.account.middleware.AccountMiddleware",  # 添加这行
+    "core.db_router.PrimaryPinningMiddleware",
 ]
 
 # Basic configurations
 ROOT_URLCONF = "core.urls"
 WSGI_APPLICATION = "core.wsgi.application"
+ASGI_APPLICATION = "core.asgi.application"
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_TZ = True
@@ -76,17 +123,32 @@ CORS_ALLOW_ALL_ORIGINS = True if DEBUG else False
 CORS_ALLOW_CREDENTIALS = True
 
 # Rest Framework settings
+# JSON 编解码：orjson（默认）或 json（标准库，DRF 内置实现）
+API_JSON_BACKEND = config("API_JSON_BACKEND", default="orjson")
+# 可浏览 API（HTML 渲染器），默认只在 DEBUG 下启用
+API_BROWSABLE = config("API_BROWSABLE", default=DEBUG, cast=bool)
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.coreapi.AutoSchema",
-    "DEFAULT_PARSER_CLASSES": ["rest_framework.parsers.JSONParser"],
-    "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",
+    "DEFAULT_PARSER_CLASSES": [
+        (
+            "api.parsers.ORJSONParser"
+            if API_JSON_BACKEND == "orjson"
+            else "rest_framework.parsers.JSONParser"
+        )
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        (
+            "api.renderers.ORJSONRenderer"
+            if API_JSON_BACKEND == "orjson"
+            else "rest_framework.renderers.JSONRenderer"
+        )
+    ]
+    + (["rest_framework.renderers.BrowsableAPIRenderer"] if API_BROWSABLE else []),
 }
 
 # JWT settings
@@ -104,6 +166,22 @@ SIMPLE_JWT = {
     "USER_ID_CLAIM": "user_id",
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
+    "TOKEN_USER_CLASS": "api.authentication.ClaimsUser",
+}
+
+# JWT authentication settings（见 api/authentication.py）
+JWT_AUTH = {
+    # 根据令牌声明（role、solana_address、is_active）构造用户，认证不查询数据库
+    "STATELESS": config("JWT_STATELESS", default=True, cast=bool),
+    # 需要完整用户时使用的用户行缓存；用户保存或删除时失效
+    "USER_CACHE": {
+        "BACKEND": config("JWT_USER_CACHE_BACKEND", default="local"),
+        "ALIAS": config("JWT_USER_CACHE_ALIAS", default="default"),
+        "TTL": config("JWT_USER_CACHE_TTL", default=60, cast=int),
+        "MAX_ENTRIES": config("JWT_USER_CACHE_MAX_ENTRIES", default=10000, cast=int),
+    },
+    # 吊销名单在每个进程内的刷新间隔（秒），其他进程的吊销最多延迟这么久生效
+    "DENY_LIST_TTL": config("JWT_DENY_LIST_TTL", default=5, cast=int),
 }
 
 # Swagger settings
@@ -118,6 +196,165 @@ SWAGGER_SETTINGS = {
 
 # Solana settings
 SOLANA_RPC_URL = config("SOLANA_RPC_URL", default="https://api.mainnet-beta.solana.com")
+SOLANA_RPC = {
+    # 并发单次调用合并为批量请求的等待窗口（毫秒）
+    "BATCH_WINDOW_MS": config("SOLANA_RPC_BATCH_WINDOW_MS", default=5, cast=int),
+    "MAX_BATCH_SIZE": config("SOLANA_RPC_MAX_BATCH_SIZE", default=100, cast=int),
+    # 每个 RPC 节点每秒允许的 HTTP 请求数及突发量
+    "RATE_LIMIT": config("SOLANA_RPC_RATE_LIMIT", default=10, cast=float),
+    "BURST": config("SOLANA_RPC_BURST", default=20, cast=int),
+    "MAX_INFLIGHT_BATCHES": 4,
+    # RPC 读请求缓存：TTL 按方法与 commitment 区分（见 api/services/rpc_cache.py）
+    "CACHE": {
+        "ENABLED": config("SOLANA_RPC_CACHE_ENABLED", default=True, cast=bool),
+        "MAX_ENTRIES": config("SOLANA_RPC_CACHE_MAX_ENTRIES", default=10000, cast=int),
+        # 非法地址等确定性错误的缓存秒数
+        "NEGATIVE_TTL": config("SOLANA_RPC_CACHE_NEGATIVE_TTL", default=300, cast=int),
+        # 覆盖默认 TTL，例如 {"getBalance": {"confirmed": 5}}
+        "TTLS": {},
+    },
+}
+
+# Wallet address validation settings
+WALLET_VALIDATION = {
+    # 要求地址在 ed25519 曲线上（拒绝 PDA 等程序派生地址）
+    "REQUIRE_ON_CURVE": config("WALLET_REQUIRE_ON_CURVE", default=False, cast=bool),
+    # 离线校验通过后是否再通过 RPC 确认（结果会被 RPC 缓存）
+    "VERIFY_ONCHAIN": config("WALLET_VERIFY_ONCHAIN", default=True, cast=bool),
+    "MAX_BATCH_SIZE": config("WALLET_VALIDATION_MAX_BATCH", default=10000, cast=int),
+}
+
+# Token permission cache settings
+PERMISSION_CACHE = {
+    # local: 进程内 LRU（其他进程依赖 TTL 过期）；django: 使用 CACHES 中的共享缓存
+    "BACKEND": config("PERMISSION_CACHE_BACKEND", default="local"),
+    "ALIAS": config("PERMISSION_CACHE_ALIAS", default="default"),
+    "TTL": config("PERMISSION_CACHE_TTL", default=30, cast=int),
+    "MAX_ENTRIES": config("PERMISSION_CACHE_MAX_ENTRIES", default=10000, cast=int),
+}
+
+# Favorite cache settings（按用户缓存收藏的代币 ID 集合，收藏变化时失效）
+FAVORITE_CACHE = {
+    # local: 进程内 LRU（其他进程依赖 TTL 过期）；django: 使用 CACHES 中的共享缓存
+    "BACKEND": config("FAVORITE_CACHE_BACKEND", default="local"),
+    "ALIAS": config("FAVORITE_CACHE_ALIAS", default="default"),
+    "TTL": config("FAVORITE_CACHE_TTL", default=60, cast=int),
+    "MAX_ENTRIES": config("FAVORITE_CACHE_MAX_ENTRIES", default=10000, cast=int),
+}
+
+# Wallet analytics settings
+WALLET_ANALYTICS = {
+    # 收益分析按列读取交易时每批的行数
+    "CHUNK_SIZE": config("WALLET_ANALYTICS_CHUNK_SIZE", default=5000, cast=int),
+}
+
+# Historical price settings（由 ingest_price_history 命令写入）
+PRICE_HISTORY = {
+    # 进程内价格序列的重新加载间隔（秒）与缓存的序列数量上限
+    "CACHE_TTL": config("PRICE_HISTORY_CACHE_TTL", default=300, cast=int),
+    "MAX_SERIES": config("PRICE_HISTORY_MAX_SERIES", default=1000, cast=int),
+}
+
+# Streaming (SSE) settings
+STREAMING = {
+    # 价格与新交易的轮询间隔（秒），每个进程每个间隔只查询一次
+    "PRICE_INTERVAL": config("STREAM_PRICE_INTERVAL", default=5, cast=int),
+    "TRANSACTION_INTERVAL": config("STREAM_TRANSACTION_INTERVAL", default=2, cast=int),
+    "PRICE_LIMIT": config("STREAM_PRICE_LIMIT", default=100, cast=int),
+    "TRANSACTION_BATCH": 500,
+    # 每次轮询重新扫描最近多少秒内出现的交易，补推晚提交（ID 较小）的行
+    "TRANSACTION_LOOKBACK": config("STREAM_TRANSACTION_LOOKBACK", default=30, cast=int),
+    # 每个连接的发送缓冲条数，满了丢弃最旧的消息
+    "BUFFER_SIZE": config("STREAM_BUFFER_SIZE", default=100, cast=int),
+    "HEARTBEAT": 15,
+    "MAX_TOKENS": 50,
+}
+
+# On-chain indexer settings
+ONCHAIN_INDEXER = {
+    # 索引使用的 RPC 节点（可指向本地测试节点）
+    "RPC_URL": config("ONCHAIN_INDEXER_RPC_URL", default=SOLANA_RPC_URL),
+    # 只索引已最终确认的交易，避免分叉导致检查点失效
+    "COMMITMENT": config("ONCHAIN_INDEXER_COMMITMENT", default="finalized"),
+    # 每个批量请求包含的 getTransaction 调用数，以及同时进行的批量请求数
+    "BATCH_SIZE": config("ONCHAIN_INDEXER_BATCH_SIZE", default=100, cast=int),
+    "CONCURRENCY": config("ONCHAIN_INDEXER_CONCURRENCY", default=4, cast=int),
+    # getSignaturesForAddress 每页数量（RPC 上限 1000）
+    "PAGE_SIZE": 1000,
+    # 首次索引（没有检查点）时最多回溯的签名数
+    "MAX_BACKFILL": config("ONCHAIN_INDEXER_MAX_BACKFILL", default=10000, cast=int),
+}
+
+# Bulk transfer settings
+BULK_TRANSFER = {
+    "MAX_ROWS": config("BULK_TRANSFER_MAX_ROWS", default=10000, cast=int),
+    # 每条 INSERT 语句写入的行数
+    "CHUNK_SIZE": config("BULK_TRANSFER_CHUNK_SIZE", default=1000, cast=int),
+}
+
+# Outbound HTTP client settings（按上游服务区分，未配置的项使用默认值）
+HTTP_CLIENTS = {
+    "coingecko": {
+        "POOL_MAXSIZE": config("COINGECKO_POOL_MAXSIZE", default=20, cast=int),
+        "CONNECT_TIMEOUT": config(
+            "COINGECKO_CONNECT_TIMEOUT", default=3.05, cast=float
+        ),
+        "READ_TIMEOUT": config("COINGECKO_READ_TIMEOUT", default=10, cast=float),
+        "MAX_RETRIES": config("COINGECKO_MAX_RETRIES", default=3, cast=int),
+        "FAILURE_THRESHOLD": config("COINGECKO_FAILURE_THRESHOLD", default=5, cast=int),
+        "RESET_TIMEOUT": config("COINGECKO_RESET_TIMEOUT", default=30, cast=int),
+    },
+    "solana_rpc": {
+        "POOL_MAXSIZE": config("SOLANA_RPC_POOL_MAXSIZE", default=20, cast=int),
+        "READ_TIMEOUT": config("SOLANA_RPC_READ_TIMEOUT", default=15, cast=float),
+    },
+}
+
+# Cache settings（多 worker 部署时可切换为 Redis/Memcached 等共享后端）
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=""),
+    }
+}
+
+# Market data cache settings
+MARKET_CACHE = {
+    # local: 进程内 LRU；django: 使用 CACHES 中的共享缓存
+    "BACKEND": config("MARKET_CACHE_BACKEND", default="local"),
+    "ALIAS": config("MARKET_CACHE_ALIAS", default="default"),
+    "TTL": config("MARKET_CACHE_TTL", default=60, cast=int),  # 新鲜期（秒）
+    "STALE_TTL": config("MARKET_CACHE_STALE_TTL", default=300, cast=int),
+    "MAX_ENTRIES": config("MARKET_CACHE_MAX_ENTRIES", default=256, cast=int),
+    "LOCK_TIMEOUT": config("MARKET_CACHE_LOCK_TIMEOUT", default=10, cast=int),
+}
+
+# Rendered response cache settings（market-list 与代币列表）
+RESPONSE_CACHE = {
+    # 渲染结果的存放位置 local: 进程内 LRU；django: 使用 CACHES 中的共享缓存。
+    # 数据版本号总是放在 CACHES 中，CACHES 为共享后端时任一进程的写入对所有进程生效
+    "BACKEND": config("RESPONSE_CACHE_BACKEND", default="local"),
+    "ALIAS": config("RESPONSE_CACHE_ALIAS", default="default"),
+    "TTL": config("RESPONSE_CACHE_TTL", default=300, cast=int),
+    # 代币列表的缓存时间：CACHES 不是共享缓存时，其他进程的写入最多在此时间后可见
+    "TOKEN_LIST_TTL": config("RESPONSE_CACHE_TOKEN_LIST_TTL", default=10, cast=int),
+    "MAX_ENTRIES": config("RESPONSE_CACHE_MAX_ENTRIES", default=1000, cast=int),
+    # GET market-list 的 Cache-Control，供 CDN/浏览器缓存
+    "MARKET_MAX_AGE": config("RESPONSE_CACHE_MARKET_MAX_AGE", default=30, cast=int),
+    "MARKET_STALE_WHILE_REVALIDATE": config(
+        "RESPONSE_CACHE_MARKET_SWR", default=60, cast=int
+    ),
+}
+
+# Market snapshot settings（由 ingest_market_data 命令写入）
+MARKET_SNAPSHOT = {
+    # 启用后 market-list 优先从本地快照读取
+    "ENABLED": config("MARKET_SNAPSHOT_ENABLED", default=True, cast=bool),
+    # 检查是否有新快照的间隔（秒）
+    "CHECK_INTERVAL": config("MARKET_SNAPSHOT_CHECK_INTERVAL", default=5, cast=int),
+}
 
 TEMPLATES = [
     {